@@ -9,6 +9,8 @@ from posts.models import Post, Group
 def mock_media(settings):
     with tempfile.TemporaryDirectory() as temp_directory:
         settings.MEDIA_ROOT = temp_directory
+        # no worker thread may write into the directory being removed
+        settings.BACKGROUND_TASKS_EAGER = True
         yield temp_directory
 
 
@@ -0,0 +1,66 @@
+"""
+JWT authentication without a user lookup per request
+"""
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from yatube.settings import JWT_USER_CACHE_TIMEOUT
+
+USER_KEY_PREFIX = 'jwt-user:'
+
+
+def user_key(user_id):
+    return f'{USER_KEY_PREFIX}{user_id}'
+
+
+def forget_user(user_id):
+    """Drop the cached user, e.g. after it was changed or deactivated"""
+    key = user_key(user_id)
+    cache.delete(key)
+    # again after commit, in case a request cached the old row meanwhile
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication keeping resolved users in cache for
+    JWT_USER_CACHE_TIMEOUT seconds; saving or deleting a user drops it.
+    Without a shared cache the timeout is 0 and every request resolves
+    the user.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            key = user_key(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            return super().get_user(validated_token)
+        user = cache.get(key) if JWT_USER_CACHE_TIMEOUT else None
+        if user is None:
+            # raises for missing and inactive users, those are not cached
+            user = super().get_user(validated_token)
+            if JWT_USER_CACHE_TIMEOUT:
+                cache.set(key, user, JWT_USER_CACHE_TIMEOUT)
+        return user
+
+
+class StatelessJWTAuthentication(CachedJWTAuthentication):
+    """
+    Opt-in for read-only endpoints: safe requests get a TokenUser built
+    from the token claims without any lookup, writes resolve the user.
+
+    A deactivated user keeps reading until the access token expires, and
+    request.user is not a User instance: filter by request.user.id.
+    """
+
+    def authenticate(self, request):
+        self.stateless = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        if self.stateless:
+            return TokenUser(validated_token)
+        return super().get_user(validated_token)
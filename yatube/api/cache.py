@@ -0,0 +1,82 @@
+"""
+Response cache of the read-only API.
+
+Response data is stored with the versions of its posts.cache scopes, so
+writes bumping any of them purge just the responses showing the changed
+rows. Hits and misses are counted to size the cache.
+"""
+import hashlib
+from functools import wraps
+
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from posts.cache import feed_version
+from yatube.settings import API_CACHE_TIMEOUT
+
+RESPONSE_KEY_PREFIX = 'api-response:'
+COUNTER_KEY_PREFIX = 'api-cache:'
+
+
+def response_key(request):
+    """Key of the normalized request: host, path and sorted query"""
+    query = sorted(request.query_params.lists())
+    raw = f'{request.get_host()}|{request.path}|{query}'
+    return RESPONSE_KEY_PREFIX + hashlib.md5(raw.encode()).hexdigest()
+
+
+def _count(counter):
+    key = COUNTER_KEY_PREFIX + counter
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # evicted in between, the next call starts it again
+            pass
+
+
+def cache_stats():
+    """Return hits, misses and hit ratio of the response cache"""
+    counters = cache.get_many(
+        [COUNTER_KEY_PREFIX + 'hits', COUNTER_KEY_PREFIX + 'misses']
+    )
+    hits = counters.get(COUNTER_KEY_PREFIX + 'hits', 0)
+    misses = counters.get(COUNTER_KEY_PREFIX + 'misses', 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else None,
+    }
+
+
+def cache_response(*scopes, bypass_params=()):
+    """
+    Cache data of a read-only viewset action under the scope versions.
+
+    Scopes are formatted with the view kwargs, e.g. 'post:{pk}'; requests
+    with any of bypass_params are not cached.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            if any(param in request.query_params for param in bypass_params):
+                return method(self, request, *args, **kwargs)
+            # the version is read first, so data computed during a write
+            # is stored under the old one and never served after it
+            version = feed_version(
+                *(scope.format(**kwargs) for scope in scopes)
+            )
+            key = response_key(request)
+            entry = cache.get(key)
+            if entry is not None and entry[0] == version:
+                _count('hits')
+                return Response(entry[1], headers={'X-API-Cache': 'hit'})
+            _count('misses')
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, (version, response.data), API_CACHE_TIMEOUT)
+            response['X-API-Cache'] = 'miss'
+            return response
+        return wrapper
+    return decorator
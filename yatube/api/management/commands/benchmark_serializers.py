@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test.utils import setup_databases, teardown_databases
+
+from api.serializers import PostSerializer, PostValuesSerializer
+from posts.models import Post, User
+
+
+class Command(BaseCommand):
+    help = 'Compare rows/sec of PostSerializer and its values() read path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000,
+                            help='Number of posts serialized')
+        parser.add_argument('--repeat', type=int, default=3,
+                            help='Runs of each path, the best one counts')
+
+    def measure(self, serialize, repeat):
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            rows = len(serialize())
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return rows / best
+
+    def benchmark(self, rows, repeat):
+        # bulk_create() of the managers sends no signals, which would bump
+        # versions in the cache shared with the site
+        User.objects.bulk_create([User(username='benchmark_author')])
+        author = User.objects.get(username='benchmark_author')
+        Post.objects.bulk_create(Post(author=author, text=f'Пост {i}' * 10)
+                                 for i in range(rows))
+        queryset = Post.objects.filter(author=author)
+        fast = PostValuesSerializer()
+        return {
+            'PostSerializer': self.measure(
+                lambda: PostSerializer(queryset.for_list(), many=True).data,
+                repeat
+            ),
+            'PostValuesSerializer': self.measure(
+                lambda: fast.to_representation(fast.values(queryset)),
+                repeat
+            ),
+        }
+
+    def handle(self, *args, **options):
+        # a test database, the site database is neither written nor locked
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            results = self.benchmark(options['rows'], options['repeat'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+        for name, speed in results.items():
+            self.stdout.write(f'{name}: {speed:.0f} rows/sec')
+        self.stdout.write('Speedup: {:.1f}x'.format(
+            results['PostValuesSerializer'] / results['PostSerializer']
+        ))
@@ -1,9 +1,18 @@
-from rest_framework.pagination import LimitOffsetPagination
-from rest_framework.response import Response
+from rest_framework.pagination import CursorPagination
 
+from yatube.settings import API_MAX_PAGE_SIZE
 
-class CustomPagination(LimitOffsetPagination):
-    def get_paginated_response(self, data):
-        if len(self.request.query_params) == 0:
-            return Response(data)
-        return super().get_paginated_response(data)
+
+class PubDateCursorPagination(CursorPagination):
+    """Opaque cursor over a stable (pub_date, id) order, no total count"""
+    ordering = ('-pub_date', '-id')
+    page_size_query_param = 'limit'
+    max_page_size = API_MAX_PAGE_SIZE
+
+
+class CreatedCursorPagination(PubDateCursorPagination):
+    ordering = ('-created', '-id')
+
+
+class IdCursorPagination(PubDateCursorPagination):
+    ordering = ('-id',)
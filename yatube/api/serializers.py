@@ -39,7 +39,7 @@ class FollowSerializer(serializers.ModelSerializer):
         default=serializers.CurrentUserDefault()
     )
     following = serializers.SlugRelatedField(
-        slug_field='username', queryset=User.objects.all())
+        source='author', slug_field='username', queryset=User.objects.all())
 
     class Meta:
         model = Follow
@@ -52,3 +52,99 @@ class FollowSerializer(serializers.ModelSerializer):
             ),
             SelfFollowValidator()
         ]
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer of values() rows for list endpoints.
+
+    Output equals serializer_class(many=True).data, but author names are
+    joined in SQL and no model instance is built per row.
+    """
+    serializer_class = None
+    # serializer field: values() column, in the order of the fields
+    columns = None
+
+    def __init__(self, context=None, fields=None):
+        """fields: names of the output fields, all of them by default"""
+        if fields is None:
+            fields = self.columns
+        unknown = set(fields) - set(self.columns)
+        if unknown:
+            raise serializers.ValidationError(
+                {'fields': f'Unknown fields: {", ".join(sorted(unknown))}.'}
+            )
+        serializer_fields = self.serializer_class(context=context).fields
+        self.context = context or {}
+        self.converters = [
+            (name, column, self.converter(serializer_fields[name]))
+            for name, column in self.columns.items() if name in fields
+        ]
+
+    def converter(self, field):
+        """Return the function representing a column value, None to keep it"""
+        if isinstance(field, serializers.FileField):
+            return self.file_url(field)
+        if isinstance(field, (serializers.DateTimeField,
+                              serializers.DateField)):
+            return field.to_representation
+        return None
+
+    def file_url(self, field):
+        """Same as FileField.to_representation, from the file name"""
+        storage = self.serializer_class.Meta.model._meta.get_field(
+            field.source
+        ).storage
+        request = self.context.get('request')
+
+        def to_representation(name):
+            if not name:
+                return None
+            if not getattr(field, 'use_url', True):
+                return name
+            if request is None:
+                return storage.url(name)
+            return request.build_absolute_uri(storage.url(name))
+
+        return to_representation
+
+    def values(self, queryset, *extra):
+        """Select the output columns and extra ones, e.g. the ordering"""
+        columns = [column for _, column, _ in self.converters]
+        return queryset.values(
+            *columns, *(column for column in extra if column not in columns)
+        )
+
+    def to_representation(self, rows):
+        converters = self.converters
+        return [
+            {
+                name: (row[column] if convert is None or row[column] is None
+                       else convert(row[column]))
+                for name, column, convert in converters
+            }
+            for row in rows
+        ]
+
+
+class PostValuesSerializer(ValuesSerializer):
+    serializer_class = PostSerializer
+    columns = {
+        'id': 'id',
+        'author': 'author__username',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'image': 'image',
+        'group': 'group_id',
+    }
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    serializer_class = CommentSerializer
+    columns = {
+        'id': 'id',
+        'post': 'post_id',
+        'author': 'author__username',
+        'text': 'text',
+        'created': 'created',
+    }
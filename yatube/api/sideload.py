@@ -0,0 +1,62 @@
+"""
+Related data side-loaded into post lists by ?include=
+
+Every include costs one query for the whole page, whatever its size.
+"""
+from django.db.models import Count, F
+
+from posts.models import Comment, Group, User
+
+
+def _groups(rows, results):
+    groups = Group.objects.filter(
+        pk__in={row['group_id'] for row in rows}
+    ).values('id', 'title', 'slug', 'description')
+    return 'groups', list(groups)
+
+
+def _authors(rows, results):
+    authors = User.objects.filter(
+        pk__in={row['author_id'] for row in rows}
+    ).values(
+        'username', 'first_name', 'last_name',
+        posts_count=F('stats__posts_count'),
+        followers_count=F('stats__followers_count'),
+    )
+    return 'authors', list(authors)
+
+
+def _comments_count(rows, results):
+    counts = dict(Comment.objects.filter(
+        post_id__in=[row['id'] for row in rows]
+    ).values_list('post_id').annotate(Count('id')).order_by())
+    for row, item in zip(rows, results):
+        item['comments_count'] = counts.get(row['id'], 0)
+    return None
+
+
+# include: (columns the rows need, loader)
+# a loader returns (name, data) of the included list or None when it
+# extends the results in place
+POST_INCLUDES = {
+    'group': (('group_id',), _groups),
+    'author': (('author_id',), _authors),
+    'comments_count': (('id',), _comments_count),
+}
+
+
+def columns(includes):
+    """Columns rows must have for the includes"""
+    return [column for include in includes
+            for column in POST_INCLUDES[include][0]]
+
+
+def side_load(includes, rows, results):
+    """Load includes of a page, return the included lists by name"""
+    included = {}
+    for include in includes:
+        loaded = POST_INCLUDES[include][1](rows, results)
+        if loaded is not None:
+            name, data = loaded
+            included[name] = data
+    return included
@@ -0,0 +1,31 @@
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+from yatube.settings import API_STREAM_CHUNK_SIZE
+
+
+def stream_json(queryset, serialize, chunk_size=None):
+    """
+    Stream queryset as a JSON array, serialize turns a chunk of rows
+    into a list of items.
+    """
+    chunk_size = chunk_size or API_STREAM_CHUNK_SIZE
+    renderer = JSONRenderer()
+
+    def chunks():
+        rows = queryset.iterator(chunk_size=chunk_size)
+        yield b'['
+        separator = b''
+        while True:
+            batch = list(islice(rows, chunk_size))
+            if not batch:
+                break
+            data = renderer.render(serialize(batch))
+            # drop the brackets of every chunk, items are joined by commas
+            yield separator + data[1:-1]
+            separator = b','
+        yield b']'
+
+    return StreamingHttpResponse(chunks(), content_type='application/json')
@@ -0,0 +1,61 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import authentication
+from posts.models import Follow
+
+User = get_user_model()
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='test_user')
+        self.author = User.objects.create_user(username='author')
+        Follow.objects.create(user=self.user, author=self.author)
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}'
+        )
+
+    def create_post(self):
+        return self.client.post('/api/v1/posts/', {'text': 'Пост'})
+
+    @mock.patch.object(authentication, 'JWT_USER_CACHE_TIMEOUT', 60)
+    def test_user_is_resolved_from_cache(self):
+        self.assertEqual(self.create_post().status_code, 201)
+        with self.assertNumQueries(0):
+            self.client.post('/api/v1/posts/', {})
+
+    @mock.patch.object(authentication, 'JWT_USER_CACHE_TIMEOUT', 60)
+    def test_deactivated_user_is_rejected(self):
+        self.create_post()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.create_post().status_code, 401)
+
+    @mock.patch.object(authentication, 'JWT_USER_CACHE_TIMEOUT', 0)
+    def test_private_cache_does_not_keep_users(self):
+        self.create_post()
+        # deactivated by another process, this one is not told
+        with mock.patch('api.signals.forget_user'):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.create_post().status_code, 401)
+
+    def test_reads_are_stateless(self):
+        self.user.is_active = False
+        self.user.save()
+        # one query for the page, none for the user
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/follow/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['following'], 'author')
+        response = self.client.post('/api/v1/follow/',
+                                    {'following': 'test_user'})
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from posts import feed
+from posts.models import AuthorStats, FeedEntry, Follow, Group, Post
+from yatube.settings import API_BULK_CREATE_LIMIT
+
+User = get_user_model()
+
+
+class BulkCreateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user')
+        self.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=self.reader, author=self.user)
+        self.group = Group.objects.create(title='Группа', slug='test-slug')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_posts_are_created_in_bulk(self):
+        items = [{'text': f'Пост {i}', 'group': self.group.pk}
+                 for i in range(3)]
+        items.insert(1, {'group': self.group.pk})
+        # a group lookup per item, the rest does not depend on the size
+        with mock.patch.object(feed, 'run_in_background') as run, \
+                self.assertNumQueries(len(items) + 6):
+            response = self.client.post('/api/v1/posts/bulk/', items,
+                                        format='json')
+        # posts are pushed into the feeds of followers off the request
+        task, *args = run.call_args[0]
+        task(*args)
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([item['status'] for item in response.data],
+                         [201, 400, 201, 201])
+        self.assertIn('text', response.data[1]['errors'])
+        created = [item['data'] for item in response.data
+                   if item['status'] == 201]
+        posts = Post.objects.in_bulk([item['id'] for item in created])
+        self.assertEqual([posts[item['id']].text for item in created],
+                         ['Пост 0', 'Пост 1', 'Пост 2'])
+        self.assertEqual(AuthorStats.objects.get(user=self.user).posts_count,
+                         3)
+        self.assertEqual(
+            set(FeedEntry.objects.filter(user=self.reader)
+                .values_list('post_id', flat=True)),
+            set(posts)
+        )
+
+    def test_comments_are_created_in_bulk(self):
+        post = Post.objects.create(author=self.reader, text='Пост')
+        items = [{'text': f'Комментарий {i}'} for i in range(3)]
+        response = self.client.post(
+            f'/api/v1/posts/{post.pk}/comments/bulk/', items, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            [item['data']['text'] for item in response.data],
+            [item['text'] for item in items]
+        )
+        self.assertEqual(
+            list(post.comments.order_by('id').values_list('id', flat=True)),
+            [item['data']['id'] for item in response.data]
+        )
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).comments_count, 3
+        )
+
+    def test_bulk_input_is_limited(self):
+        for data in ({'text': 'Пост'},
+                     [{'text': 'Пост'}] * (API_BULK_CREATE_LIMIT + 1)):
+            response = self.client.post('/api/v1/posts/bulk/', data,
+                                        format='json')
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(Post.objects.exists())
+
+    def test_bulk_create_needs_authentication(self):
+        response = APIClient().post('/api/v1/posts/bulk/',
+                                    [{'text': 'Пост'}], format='json')
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='test_user')
+        self.group = Group.objects.create(title='Группа', slug='test-slug')
+        self.post = Post.objects.create(author=self.user, text='Пост',
+                                        group=self.group)
+        self.client = APIClient()
+        self.urls = (
+            '/api/v1/posts/',
+            f'/api/v1/posts/{self.post.pk}/',
+            '/api/v1/groups/',
+            f'/api/v1/groups/{self.group.pk}/',
+        )
+
+    def assertCached(self, url, hit=True):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-API-Cache'], 'hit' if hit else 'miss')
+        return response
+
+    def test_responses_are_cached(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = self.assertCached(url, hit=False)
+                with self.assertNumQueries(0):
+                    second = self.assertCached(url)
+                self.assertEqual(first.content, second.content)
+
+    def test_query_is_normalized(self):
+        self.assertCached('/api/v1/posts/?limit=2&fields=id,text', hit=False)
+        self.assertCached('/api/v1/posts/?fields=id,text&limit=2')
+        self.assertCached('/api/v1/posts/?limit=3&fields=id,text', hit=False)
+        self.client.get('/api/v1/posts/?include=group')
+        response = self.client.get('/api/v1/posts/?include=group')
+        self.assertNotIn('X-API-Cache', response)
+
+    def test_writes_invalidate_responses(self):
+        for url in self.urls:
+            self.client.get(url)
+        Comment.objects.create(post=self.post, author=self.user,
+                               text='Комментарий')
+        for url in self.urls:
+            self.assertCached(url)
+        self.post.text = 'Новый текст'
+        self.post.save()
+        for url in self.urls[:2]:
+            response = self.assertCached(url, hit=False)
+            self.assertContains(response, 'Новый текст')
+        self.group.title = 'Новая группа'
+        self.group.save()
+        for url in self.urls:
+            self.assertCached(url, hit=False)
+
+    def test_stats_are_counted(self):
+        url = '/api/v1/cache-stats/'
+        self.client.get(self.urls[0])
+        self.client.get(self.urls[0])
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        admin = User.objects.create_superuser(username='admin',
+                                              email='admin@yatube.ru',
+                                              password='password')
+        self.client.force_authenticate(admin)
+        response = self.client.get(url)
+        self.assertEqual(response.data,
+                         {'hits': 1, 'misses': 1, 'hit_ratio': 0.5})
@@ -0,0 +1,75 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Follow, Post
+
+User = get_user_model()
+
+URL = '/api/v1/changes/'
+
+
+class ChangesTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user')
+        self.author = User.objects.create_user(username='author')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sync(self, since='', limit=''):
+        response = self.client.get(URL, {'since': since, 'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def summary(self, data):
+        return [(item['kind'], item['id'], item['action'])
+                for item in data['changes']]
+
+    def test_changes_since_checkpoint(self):
+        post = Post.objects.create(author=self.author, text='Пост')
+        token = self.sync()['since']
+        comment = Comment.objects.create(post=post, author=self.user,
+                                         text='Комментарий')
+        post.text = 'Новый текст'
+        post.save()
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        Follow.objects.create(user=self.author, author=self.user)
+        data = self.sync(token)
+        self.assertEqual(self.summary(data), [
+            ('comment', comment.pk, 'created'),
+            ('post', post.pk, 'updated'),
+            ('follow', follow.pk, 'created'),
+        ])
+        self.assertEqual(data['changes'][1]['data']['text'], 'Новый текст')
+        self.assertEqual(data['changes'][2]['data'],
+                         {'user': 'test_user', 'following': 'author'})
+        self.assertFalse(data['has_more'])
+
+        token = data['since']
+        post_id = post.pk
+        post.delete()
+        data = self.sync(token)
+        # comments of the post are deleted with it
+        self.assertEqual(self.summary(data), [
+            ('comment', comment.pk, 'deleted'),
+            ('post', post_id, 'deleted'),
+        ])
+        self.assertNotIn('data', data['changes'][0])
+        self.assertEqual(self.sync(data['since'])['changes'], [])
+
+    def test_changes_are_batched(self):
+        posts = [Post.objects.create(author=self.author, text=f'Пост {i}')
+                 for i in range(5)]
+        seen, since = [], ''
+        while True:
+            data = self.sync(since, limit=2)
+            self.assertLessEqual(len(data['changes']), 2)
+            seen.extend(item['id'] for item in data['changes'])
+            since = data['since']
+            if not data['has_more']:
+                break
+        self.assertEqual(seen, [post.pk for post in posts])
+
+    def test_invalid_token(self):
+        response = self.client.get(URL, {'since': 'abc'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api import views
+from posts import feed
+from posts.models import AuthorStats, Change, FeedEntry, Follow, Post
+
+User = get_user_model()
+
+
+class BulkFollowTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user')
+        self.authors = [User.objects.create_user(username=f'author_{i}')
+                        for i in range(4)]
+        for author in self.authors:
+            Post.objects.create(author=author, text='Пост')
+        Follow.objects.create(user=self.user, author=self.authors[0])
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.usernames = ['author_0', 'author_1', 'test_user', 'author_2',
+                          'nobody']
+
+    def stats(self, user):
+        return AuthorStats.objects.get(user=user)
+
+    def test_bulk_follow(self):
+        with mock.patch.object(feed, 'run_in_background') as run, \
+                self.assertNumQueries(11):
+            response = self.client.post('/api/v1/follow/bulk/',
+                                        {'following': self.usernames},
+                                        format='json')
+        # posts of the new authors are copied into the feed off the request
+        task, *args = run.call_args[0]
+        task(*args)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'followed': ['author_1', 'author_2'],
+            'skipped': ['author_0', 'test_user'],
+            'not_found': ['nobody'],
+        })
+        self.assertEqual(
+            set(Follow.objects.filter(user=self.user)
+                .values_list('author__username', flat=True)),
+            {'author_0', 'author_1', 'author_2'}
+        )
+        self.assertEqual(self.stats(self.user).following_count, 3)
+        self.assertEqual(self.stats(self.authors[1]).followers_count, 1)
+        self.assertEqual(FeedEntry.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(Change.objects.filter(
+            kind=Change.FOLLOW, owner_id=self.user.pk
+        ).count(), 3)
+
+    def test_concurrent_follow_is_skipped(self):
+        follow = views.FollowViewSet._follow
+        attempts = []
+
+        def racing(user_id, authors):
+            attempts.append(authors)
+            if len(attempts) > 1:
+                return follow(user_id, authors)
+            # another request follows author_1 between check and insert
+            with mock.patch.object(views, 'bulk_insert',
+                                   side_effect=IntegrityError):
+                try:
+                    follow(user_id, authors)
+                finally:
+                    Follow.objects.create(user=self.user,
+                                          author=self.authors[1])
+
+        with mock.patch.object(views.FollowViewSet, '_follow',
+                               staticmethod(racing)):
+            response = self.client.post('/api/v1/follow/bulk/',
+                                        {'following': self.usernames},
+                                        format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(attempts), 2)
+        self.assertEqual(response.data['followed'], ['author_2'])
+        self.assertEqual(response.data['skipped'],
+                         ['author_0', 'author_1', 'test_user'])
+        self.assertEqual(self.stats(self.user).following_count, 3)
+
+    def test_bulk_unfollow(self):
+        Follow.objects.create(user=self.user, author=self.authors[1])
+        response = self.client.post('/api/v1/follow/bulk-delete/',
+                                    {'following': self.usernames},
+                                    format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'unfollowed': ['author_0', 'author_1'],
+            'skipped': ['test_user', 'author_2'],
+            'not_found': ['nobody'],
+        })
+        self.assertFalse(Follow.objects.filter(user=self.user).exists())
+        self.assertEqual(self.stats(self.user).following_count, 0)
+        self.assertEqual(self.stats(self.authors[0]).followers_count, 0)
+        self.assertFalse(FeedEntry.objects.filter(user=self.user).exists())
+
+    def test_bulk_input_is_validated(self):
+        for data in ({}, {'following': 'author_1'}, {'following': [1]}):
+            with self.subTest(data=data):
+                response = self.client.post('/api/v1/follow/bulk/', data,
+                                            format='json')
+                self.assertEqual(response.status_code, 400)
+
+    def test_counts_and_check(self):
+        response = self.client.get('/api/v1/follow/counts/')
+        self.assertEqual(response.data, {'username': 'test_user',
+                                         'followers_count': 0,
+                                         'following_count': 1})
+        response = self.client.get('/api/v1/follow/counts/',
+                                   {'username': 'author_0'})
+        self.assertEqual(response.data['followers_count'], 1)
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                '/api/v1/follow/check/',
+                {'usernames': 'author_0,author_1,nobody'}
+            )
+        self.assertEqual(response.data, {'author_0': True, 'author_1': False,
+                                         'nobody': False})
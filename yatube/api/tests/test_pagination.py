@@ -0,0 +1,81 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Follow, Post
+from yatube.settings import API_MAX_PAGE_SIZE
+
+User = get_user_model()
+
+POSTS_NUM = 7
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.post = Post.objects.create(author=self.user, text='Пост 0')
+        for i in range(1, POSTS_NUM):
+            Post.objects.create(author=self.user, text=f'Пост {i}')
+            Comment.objects.create(post=self.post, author=self.user,
+                                   text=f'Комментарий {i}')
+
+    def walk(self, url, key='id'):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids.extend(item[key] for item in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_posts_are_paginated_by_cursor(self):
+        ids = self.walk('/api/v1/posts/?limit=3')
+        expected = list(Post.objects.order_by('-pub_date', '-id')
+                        .values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_comments_are_paginated_by_cursor(self):
+        ids = self.walk(f'/api/v1/posts/{self.post.pk}/comments/?limit=4')
+        expected = list(self.post.comments.order_by('-created', '-id')
+                        .values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_comments_are_streamed(self):
+        url = f'/api/v1/posts/{self.post.pk}/comments/'
+        with mock.patch('api.streaming.API_STREAM_CHUNK_SIZE', 2):
+            response = self.client.get(url + '?stream=1')
+        self.assertTrue(response.streaming)
+        streamed = json.loads(b''.join(response.streaming_content))
+        expected = list(self.post.comments.order_by('-created', '-id'))
+        self.assertEqual([item['id'] for item in streamed],
+                         [comment.pk for comment in expected])
+        first_page = self.client.get(url + f'?limit={len(expected)}')
+        self.assertEqual(streamed, json.loads(first_page.content)['results'])
+        for value in ('0', 'false', ''):
+            with self.subTest(stream=value):
+                response = self.client.get(url + f'?stream={value}')
+                self.assertFalse(response.streaming)
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(
+            f'/api/v1/posts/?limit={API_MAX_PAGE_SIZE * 10}'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), POSTS_NUM)
+        # no limit falls back to PAGE_SIZE instead of the whole table
+        response = self.client.get('/api/v1/posts/')
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_follows_are_paginated_by_cursor(self):
+        for i in range(3):
+            author = User.objects.create_user(username=f'author_{i}')
+            Follow.objects.create(user=self.user, author=author)
+        authors = self.walk('/api/v1/follow/?limit=2', key='following')
+        self.assertEqual(authors, ['author_2', 'author_1', 'author_0'])
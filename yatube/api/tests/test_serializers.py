@@ -0,0 +1,67 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from posts.models import Comment, Group, Post
+from posts.tests.constants import TEST_IMAGE
+from ..serializers import (CommentSerializer, CommentValuesSerializer,
+                           PostSerializer, PostValuesSerializer)
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT,
+                   BACKGROUND_TASKS_EAGER=True)
+class ValuesSerializerTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user')
+        group = Group.objects.create(title='Группа', slug='test-slug')
+        Post.objects.create(author=self.user, text='Пост без группы')
+        self.post = Post.objects.create(
+            author=self.user, text='Пост "с картинкой"', group=group,
+            image=SimpleUploadedFile(name='test_image.gif',
+                                     content=TEST_IMAGE,
+                                     content_type='image/gif'),
+        )
+        Comment.objects.create(post=self.post, author=self.user,
+                               text='Комментарий')
+
+    def assertSameOutput(self, serializer_class, fast_class, queryset,
+                         context):
+        expected = serializer_class(queryset, many=True, context=context).data
+        fast = fast_class(context)
+        rendered = fast.to_representation(fast.values(queryset))
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(rendered), renderer.render(expected))
+
+    def test_output_is_identical(self):
+        request = APIRequestFactory().get('/api/v1/posts/')
+        for context in ({}, {'request': request}):
+            with self.subTest(context=context):
+                self.assertSameOutput(PostSerializer, PostValuesSerializer,
+                                      Post.objects.order_by('id'), context)
+                self.assertSameOutput(CommentSerializer,
+                                      CommentValuesSerializer,
+                                      Comment.objects.order_by('id'), context)
+
+    def test_list_endpoints_join_authors(self):
+        client = APIClient()
+        with self.assertNumQueries(1):
+            response = client.get('/api/v1/posts/')
+        self.assertEqual(len(response.data['results']), 2)
+        with self.assertNumQueries(2):
+            response = client.get(f'/api/v1/posts/{self.post.pk}/comments/')
+        self.assertEqual(response.data['results'][0]['author'], 'test_user')
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user',
+                                             first_name='Лев')
+        self.group = Group.objects.create(title='Группа', slug='test-slug')
+        self.posts = [
+            Post.objects.create(author=self.user, text=f'Пост {i}',
+                                group=self.group if i % 2 else None)
+            for i in range(4)
+        ]
+        for i in range(3):
+            Comment.objects.create(post=self.posts[1], author=self.user,
+                                   text=f'Комментарий {i}')
+        self.client = APIClient()
+
+    def test_fields_trim_output_and_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                '/api/v1/posts/?limit=2&fields=id,author'
+            )
+        self.assertEqual(response.status_code, 200)
+        for item in response.data['results']:
+            self.assertEqual(list(item), ['id', 'author'])
+        self.assertNotIn('"text"', queries[0]['sql'])
+        # next page still works without pub_date in the output
+        response = self.client.get(response.data['next'])
+        self.assertEqual([item['id'] for item in response.data['results']],
+                         [self.posts[1].pk, self.posts[0].pk])
+
+    def test_unknown_fields_and_includes_are_rejected(self):
+        for url in ('/api/v1/posts/?fields=id,password',
+                    '/api/v1/posts/?include=followers'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 400)
+
+    def test_includes_are_batched(self):
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                '/api/v1/posts/?limit=4&fields=id,group'
+                '&include=group,comments_count,author'
+            )
+        self.assertEqual(response.status_code, 200)
+        counts = {item['id']: item['comments_count']
+                  for item in response.data['results']}
+        self.assertEqual(counts, {post.pk: 3 if post == self.posts[1] else 0
+                                  for post in self.posts})
+        included = response.data['included']
+        self.assertEqual(included['groups'], [{
+            'id': self.group.pk, 'title': 'Группа', 'slug': 'test-slug',
+            'description': '',
+        }])
+        self.assertEqual(included['authors'], [{
+            'username': 'test_user', 'first_name': 'Лев', 'last_name': '',
+            'posts_count': 4, 'followers_count': 0,
+        }])
+        self.assertNotIn('ETag', response)
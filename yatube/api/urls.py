@@ -1,7 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from api.views import PostViewSet, GroupViewSet, CommentViewSet, FollowViewSet
+from api.views import (PostViewSet, GroupViewSet, CommentViewSet,
+                       FollowViewSet, AutocompleteView, CacheStatsView,
+                       ChangesView)
 
 router_v1 = DefaultRouter()
 router_v1.register('posts', PostViewSet, basename='post')
@@ -12,4 +14,8 @@ router_v1.register('follow', FollowViewSet, basename='follow')
 urlpatterns = [
     path('v1/', include('djoser.urls.jwt')),
     path('v1/', include(router_v1.urls)),
+    path('v1/cache-stats/', CacheStatsView.as_view(), name='cache_stats'),
+    path('v1/changes/', ChangesView.as_view(), name='changes'),
+    path('v1/autocomplete/', AutocompleteView.as_view(),
+         name='autocomplete'),
 ]
@@ -4,5 +4,5 @@ from rest_framework import serializers
 class SelfFollowValidator:
 
     def __call__(self, data):
-        if data['user'] == data['following']:
+        if data['user'] == data['author']:
             raise serializers.ValidationError("You can't follow yourself")
@@ -1,27 +1,161 @@
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework import filters, status, viewsets, permissions, mixins
 
-from posts.models import Post, Group, Comment, Follow
-from .pagination import CustomPagination
+from posts import autocomplete, changes, search
+from posts.bulk import bulk_delete, bulk_insert
+from posts.cache import feed_etag
+from posts.models import Change, Post, Group, Comment, Follow, User
+from posts.stats import get_stats
+from yatube.settings import (API_BULK_CREATE_LIMIT, API_CHANGES_BATCH_SIZE,
+                             AUTOCOMPLETE_RESULTS)
+from .authentication import StatelessJWTAuthentication
+from .cache import cache_response, cache_stats
+from .pagination import (CreatedCursorPagination, IdCursorPagination,
+                         PubDateCursorPagination)
 from .permissions import IsAuthorOrReadOnlyPermission
+from .sideload import POST_INCLUDES, columns, side_load
 from .serializers import (PostSerializer, GroupSerializer, CommentSerializer,
-                          FollowSerializer)
+                          FollowSerializer, CommentValuesSerializer,
+                          PostValuesSerializer)
+from .streaming import stream_json
+
+
+def _query_list(request, param):
+    """Comma separated values of a query parameter, None if it is missing"""
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return [item for item in value.split(',') if item]
+
+
+def _query_flag(request, param):
+    """Whether a query parameter is set to a true value"""
+    value = request.query_params.get(param, '')
+    return value.lower() in ('1', 'true', 'yes')
 
 
 class PermissionViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAuthorOrReadOnlyPermission,)
 
+    def bulk_create(self, request, **fields):
+        """
+        Validate every item of a JSON array, insert the valid ones with one
+        query and return a result per item: data or errors.
+        """
+        if not isinstance(request.data, list):
+            return Response({'detail': 'Expected a list of items.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > API_BULK_CREATE_LIMIT:
+            return Response(
+                {'detail': f'At most {API_BULK_CREATE_LIMIT} items.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        model = self.get_serializer_class().Meta.model
+        results, objs = [], []
+        for item in request.data:
+            serializer = self.get_serializer(data=item)
+            if serializer.is_valid():
+                objs.append(model(**serializer.validated_data, **fields))
+                results.append(None)
+            else:
+                results.append({'status': status.HTTP_400_BAD_REQUEST,
+                                'errors': serializer.errors})
+        created = iter(self.get_serializer(
+            bulk_insert(model, objs), many=True
+        ).data)
+        results = [
+            result or {'status': status.HTTP_201_CREATED,
+                       'data': next(created)}
+            for result in results
+        ]
+        return Response(
+            results,
+            status=(status.HTTP_201_CREATED if len(objs) == len(results)
+                    else status.HTTP_207_MULTI_STATUS)
+        )
+
 
+@method_decorator(condition(
+    # included counters are not covered by the versions
+    etag_func=lambda request: (
+        None if request.GET.get('include') else feed_etag('index')
+    )
+), name='list')
 class PostViewSet(PermissionViewSet):
-    queryset = Post.objects.all()
+    queryset = Post.objects.for_list()
     serializer_class = PostSerializer
-    pagination_class = CustomPagination
+    pagination_class = PubDateCursorPagination
 
+    @transaction.atomic
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    @cache_response('post:{pk}')
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    # included counters are not covered by the versions
+    @cache_response('index', bypass_params=('include',))
+    def list(self, request):
+        """
+        List of posts, ?fields= trims it, ?include= side-loads data,
+        ?search= keeps posts matching the words
+        """
+        includes = _query_list(request, 'include') or []
+        unknown = set(includes) - set(POST_INCLUDES)
+        if unknown:
+            raise ValidationError(
+                {'include': f'Unknown includes: {", ".join(sorted(unknown))}.'}
+            )
+        fast = PostValuesSerializer(self.get_serializer_context(),
+                                    _query_list(request, 'fields'))
+        queryset = self.get_queryset()
+        query = request.query_params.get('search')
+        if query is not None:
+            # matches keep the cursor order, the search page ranks them
+            queryset = search.matching(queryset, query)
+        # the cursor is read from the first ordering column
+        page = self.paginate_queryset(fast.values(
+            queryset, 'pub_date', *columns(includes)
+        ))
+        results = fast.to_representation(page)
+        included = side_load(includes, page, results)
+        response = self.get_paginated_response(results)
+        if included:
+            response.data['included'] = included
+        return response
+
+    @staticmethod
+    def _follow(user_id, authors):
+        """Follow the authors not followed yet, return their names"""
+        with transaction.atomic():
+            followed = set(Follow.objects.filter(
+                user_id=user_id, author_id__in=authors.values()
+            ).values_list('author_id', flat=True))
+            # both constraints are checked here, not by failing inserts
+            new = [name for name, author_id in authors.items()
+                   if author_id != user_id and author_id not in followed]
+            bulk_insert(Follow, [Follow(user_id=user_id,
+                                        author_id=authors[name])
+                                 for name in new])
+        return new
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request):
+        return self.bulk_create(request, author=request.user)
+
 
+@method_decorator(condition(
+    # groups changes bump the global scope
+    etag_func=lambda request: feed_etag()
+), name='list')
 class GroupViewSet(viewsets.ModelViewSet):
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
@@ -29,17 +163,35 @@ class GroupViewSet(viewsets.ModelViewSet):
     def create(self, request):
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    @cache_response()
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
 
+    @cache_response()
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+
+@method_decorator(condition(
+    etag_func=lambda request, post_id: feed_etag(f'comments:{post_id}')
+), name='list')
 class CommentViewSet(PermissionViewSet):
-    queryset = Comment.objects.all()
+    queryset = Comment.objects.for_list()
     serializer_class = CommentSerializer
+    pagination_class = CreatedCursorPagination
 
     def list(self, request, post_id):
         post = get_object_or_404(Post, id=post_id)
-        comments = post.comments.all()
-        serializer = CommentSerializer(comments, many=True)
-        return Response(serializer.data)
+        fast = CommentValuesSerializer(self.get_serializer_context())
+        comments = fast.values(post.comments.all())
+        if _query_flag(request, 'stream'):
+            # the whole list without holding it in memory
+            return stream_json(comments.order_by('-created', '-id'),
+                               fast.to_representation)
+        page = self.paginate_queryset(comments)
+        return self.get_paginated_response(fast.to_representation(page))
 
+    @transaction.atomic
     def create(self, request, post_id):
         serializer = CommentSerializer(data=request.data)
         if serializer.is_valid():
@@ -48,20 +200,235 @@ class CommentViewSet(PermissionViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @staticmethod
+    def _follow(user_id, authors):
+        """Follow the authors not followed yet, return their names"""
+        with transaction.atomic():
+            followed = set(Follow.objects.filter(
+                user_id=user_id, author_id__in=authors.values()
+            ).values_list('author_id', flat=True))
+            # both constraints are checked here, not by failing inserts
+            new = [name for name, author_id in authors.items()
+                   if author_id != user_id and author_id not in followed]
+            bulk_insert(Follow, [Follow(user_id=user_id,
+                                        author_id=authors[name])
+                                 for name in new])
+        return new
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk(self, request, post_id):
+        post = get_object_or_404(Post, id=post_id)
+        return self.bulk_create(request, author=request.user, post=post)
+
 
 class FollowViewSet(mixins.CreateModelMixin,
                     mixins.ListModelMixin,
                     viewsets.GenericViewSet):
     queryset = Follow.objects.all()
     serializer_class = FollowSerializer
+    authentication_classes = (StatelessJWTAuthentication,)
     permission_classes = (permissions.IsAuthenticated, )
+    pagination_class = IdCursorPagination
     filter_backends = (filters.SearchFilter,)
-    search_fields = ('=user__username', '=following__username')
+    search_fields = ('=user__username', '=author__username')
 
     def get_queryset(self):
-        queryset = Follow.objects.filter(user=self.request.user)
+        # request.user is a TokenUser on reads
+        queryset = Follow.objects.filter(
+            user_id=self.request.user.id
+        ).select_related('user', 'author')
         return queryset
 
+    @transaction.atomic
     def perform_create(self, serializer):
         user = self.request.user
         serializer.save(user=user)
+
+    @staticmethod
+    def _usernames(value):
+        if (not isinstance(value, list)
+                or not all(isinstance(name, str) for name in value)):
+            raise ValidationError('Expected a list of usernames.')
+        if len(value) > API_BULK_CREATE_LIMIT:
+            raise ValidationError(
+                f'At most {API_BULK_CREATE_LIMIT} usernames.'
+            )
+        return value
+
+    def _authors(self, request):
+        """Return ids of the users named in the body and unknown names"""
+        data = request.data if isinstance(request.data, dict) else {}
+        usernames = self._usernames(data.get('following'))
+        found = dict(User.objects.filter(
+            username__in=usernames
+        ).values_list('username', 'pk'))
+        # in the order of the request
+        authors = {name: found[name] for name in usernames if name in found}
+        return authors, [name for name in usernames if name not in found]
+
+    @staticmethod
+    def _follow(user_id, authors):
+        """Follow the authors not followed yet, return their names"""
+        with transaction.atomic():
+            followed = set(Follow.objects.filter(
+                user_id=user_id, author_id__in=authors.values()
+            ).values_list('author_id', flat=True))
+            # both constraints are checked here, not by failing inserts
+            new = [name for name, author_id in authors.items()
+                   if author_id != user_id and author_id not in followed]
+            bulk_insert(Follow, [Follow(user_id=user_id,
+                                        author_id=authors[name])
+                                 for name in new])
+        return new
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_follow(self, request):
+        """Follow all users of the "following" list at once"""
+        authors, not_found = self._authors(request)
+        try:
+            new = self._follow(request.user.pk, authors)
+        except IntegrityError:
+            # a concurrent request followed some of the authors; its rows
+            # are committed by the time the insert fails, so filter again
+            new = self._follow(request.user.pk, authors)
+        return Response({
+            'followed': new,
+            'skipped': [name for name in authors if name not in new],
+            'not_found': not_found,
+        })
+
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_unfollow(self, request):
+        """Unfollow all users of the "following" list at once"""
+        authors, not_found = self._authors(request)
+        names = {author_id: name for name, author_id in authors.items()}
+        deleted = bulk_delete(Follow.objects.filter(
+            user_id=request.user.pk, author_id__in=names
+        ))
+        unfollowed = {names[follow.author_id] for follow in deleted}
+        return Response({
+            'unfollowed': [name for name in authors if name in unfollowed],
+            'skipped': [name for name in authors if name not in unfollowed],
+            'not_found': not_found,
+        })
+
+    @action(detail=False)
+    def counts(self, request):
+        """Follower and following counts, of ?username= or of the user"""
+        username = request.query_params.get('username')
+        users = User.objects.select_related('stats')
+        if username is None:
+            user = get_object_or_404(users, pk=request.user.id)
+        else:
+            user = get_object_or_404(users, username=username)
+        stats = get_stats(user)
+        return Response({
+            'username': user.username,
+            'followers_count': stats.followers_count,
+            'following_count': stats.following_count,
+        })
+
+    @action(detail=False)
+    def check(self, request):
+        """Whether the user follows each of ?usernames=a,b,..."""
+        usernames = self._usernames(
+            _query_list(request, 'usernames') or []
+        )
+        following = set(Follow.objects.filter(
+            user_id=request.user.id, author__username__in=usernames
+        ).values_list('author__username', flat=True))
+        return Response({name: name in following for name in usernames})
+
+
+class CacheStatsView(APIView):
+    """Hit and miss counters of the API response cache"""
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        return Response(cache_stats())
+
+
+class AutocompleteView(APIView):
+    """
+    Users and groups with a name starting with ?q=.
+
+    Answered from the in-memory indexes of posts.autocomplete, without
+    database queries; ?kind=users or ?kind=groups limits the lookup.
+    """
+    # public names only, the form widgets call it with a session
+    authentication_classes = ()
+    permission_classes = (permissions.AllowAny,)
+
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        kinds = _query_list(request, 'kind') or autocomplete.INDEXES
+        unknown = set(kinds) - autocomplete.INDEXES.keys()
+        if unknown:
+            raise ValidationError(
+                {'kind': f'Unknown kinds: {", ".join(sorted(unknown))}.'}
+            )
+        return Response({
+            kind: autocomplete.INDEXES[kind].search(query,
+                                                    AUTOCOMPLETE_RESULTS)
+            for kind in kinds
+        })
+
+
+class ChangesView(APIView):
+    """
+    Posts, comments and own follows changed after a checkpoint.
+
+    ?since= takes the token of the previous batch, no token starts from
+    the beginning. Every object shows up once per batch with its last
+    action and current data, deleted ones as tombstones without data.
+    """
+
+    def load(self, kind, ids):
+        """Return current data of the objects by id"""
+        context = {'request': self.request}
+        if kind == Change.POST:
+            fast = PostValuesSerializer(context)
+            rows = fast.values(Post.objects.filter(pk__in=ids))
+            return {item['id']: item for item in fast.to_representation(rows)}
+        if kind == Change.COMMENT:
+            fast = CommentValuesSerializer(context)
+            rows = fast.values(Comment.objects.filter(pk__in=ids))
+            return {item['id']: item for item in fast.to_representation(rows)}
+        follows = Follow.objects.filter(
+            pk__in=ids, user_id=self.request.user.id
+        ).select_related('user', 'author')
+        return {follow.pk: FollowSerializer(follow).data
+                for follow in follows}
+
+    def get(self, request):
+        try:
+            since = int(request.query_params.get('since') or 0)
+            limit = min(int(request.query_params.get('limit')
+                            or API_CHANGES_BATCH_SIZE),
+                        API_CHANGES_BATCH_SIZE)
+        except ValueError:
+            raise ValidationError('since and limit must be integers.')
+        batch, has_more = changes.read(since, request.user.id, max(limit, 1))
+        last = {}
+        for change in batch:
+            # dicts keep the order of the first change of every object
+            last[change.kind, change.object_id] = change
+        ids = {}
+        for kind, object_id in last:
+            ids.setdefault(kind, []).append(object_id)
+        data = {kind: self.load(kind, kind_ids)
+                for kind, kind_ids in ids.items()}
+        results = []
+        for (kind, object_id), change in last.items():
+            item = {'kind': kind, 'id': object_id, 'action': change.action}
+            if change.action != Change.DELETED:
+                if object_id not in data[kind]:
+                    # deleted meanwhile, its tombstone is further in the log
+                    continue
+                item['data'] = data[kind][object_id]
+            results.append(item)
+        return Response({
+            'changes': results,
+            'since': str(batch[-1].pk if batch else since),
+            'has_more': has_more,
+        })
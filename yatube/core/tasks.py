@@ -0,0 +1,34 @@
+"""
+Background execution of slow work, off the request path
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.BACKGROUND_WORKERS,
+    thread_name_prefix='background',
+)
+
+
+def _run(func, args):
+    try:
+        func(*args)
+    except Exception:
+        logger.exception('Background task %s failed', func.__name__)
+    finally:
+        # worker threads have their own connections
+        connections.close_all()
+
+
+def run_in_background(func, *args):
+    """Run func(*args) in a worker thread once the transaction commits"""
+    if settings.BACKGROUND_TASKS_EAGER:
+        # tests only: TestCase transactions are never committed
+        func(*args)
+        return
+    transaction.on_commit(lambda: _executor.submit(_run, func, args))
@@ -1,15 +1,62 @@
 from django.contrib import admin
 
+from posts import autocomplete, search
+from posts.forms import AutocompleteInput
 from posts.models import Group, Post, Comment, Follow
+from posts.paginator import ApproximateCountPaginator
 from yatube.settings import EMPTY_VALUE
 
 
+class FullTextSearchMixin:
+    """Search with the full-text index instead of LIKE scans"""
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search.matching(queryset, search_term), False
+
+
+class AutocompleteMixin:
+    """Foreign keys completed from the in-memory indexes of names"""
+    # field: (index, item field shown in the search box)
+    autocomplete_indexes = {}
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.autocomplete_indexes and (
+            'widget' not in kwargs
+        ):
+            kwargs['widget'] = AutocompleteInput(
+                *self.autocomplete_indexes[db_field.name]
+            )
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+
+USER_AUTOCOMPLETE = (autocomplete.users, 'username')
+GROUP_AUTOCOMPLETE = (autocomplete.groups, 'slug')
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    """Changelist without COUNT(*) over the whole table"""
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+
+    empty_value_display = EMPTY_VALUE
+
+
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(FullTextSearchMixin, AutocompleteMixin, ScalableAdmin):
     # Fields to display
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_display = ('pk', 'text', 'pub_date', 'author', 'group_title',
+                    'group')
+    # Joined, not loaded per row
+    list_select_related = ('author', 'group')
     # Editable fields
     list_editable = ('group',)
+    # Widgets not listing all users and groups, also in the changelist
+    autocomplete_indexes = {
+        'author': USER_AUTOCOMPLETE,
+        'group': GROUP_AUTOCOMPLETE,
+    }
     # Field where search will be held
     search_fields = ('text',)
     # Filter fields
@@ -17,14 +64,29 @@ class PostAdmin(admin.ModelAdmin):
 
     empty_value_display = EMPTY_VALUE
 
+    def group_title(self, obj):
+        return obj.group.title if obj.group else None
+    group_title.short_description = 'Группа'
+    group_title.admin_order_field = 'group__title'
 
-admin.site.register(Group)
+
+@admin.register(Group)
+class GroupAdmin(ScalableAdmin):
+    # Fields to display
+    list_display = ('pk', 'title', 'slug')
+    # Field where search will be held
+    search_fields = ('title', 'slug')
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FullTextSearchMixin, AutocompleteMixin, ScalableAdmin):
     # Fields to display
     list_display = ('pk', 'post', 'author', 'text')
+    # Joined, not loaded per row
+    list_select_related = ('post', 'author')
+    # Widgets not listing all posts and users
+    raw_id_fields = ('post',)
+    autocomplete_indexes = {'author': USER_AUTOCOMPLETE}
     # Field where search will be held
     search_fields = ('text',)
     # Filter fields
@@ -34,9 +96,16 @@ class CommentAdmin(admin.ModelAdmin):
 
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(AutocompleteMixin, ScalableAdmin):
     # Fields to display
     list_display = ('user', 'author')
+    # Joined, not loaded per row
+    list_select_related = ('user', 'author')
+    # Widgets not listing all users
+    autocomplete_indexes = {
+        'user': USER_AUTOCOMPLETE,
+        'author': USER_AUTOCOMPLETE,
+    }
     # Field where search will be held
-    search_fields = ('user',)
+    search_fields = ('=user__username', '=author__username')
     empty_value_display = EMPTY_VALUE
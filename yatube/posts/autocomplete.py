@@ -0,0 +1,204 @@
+"""
+In-memory prefix indexes of usernames and groups for autocomplete.
+
+Every process keeps the names of an index sorted in a list and answers a
+prefix with a bisect, so a lookup never queries the database. Signal
+handlers bump the version of an index in the cache and log the changed
+entry under the new version, unless nothing shown has changed; every
+process, the writing one too, replays the logged entries on its next
+lookup. As with feed caches, the entry is logged again after commit.
+Only a gap in the log, e.g. an expired entry, makes a process reload the
+index from the database, in background, serving the old one meanwhile.
+With a private cache the version expires every AUTOCOMPLETE_RELOAD
+seconds, which is such a gap.
+"""
+import bisect
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from core.tasks import run_in_background
+from posts.models import Group, User
+from posts.search import normalize
+from yatube.settings import AUTOCOMPLETE_RELOAD
+
+VERSION_KEY_PREFIX = 'autocomplete-version:'
+DELTA_KEY_PREFIX = 'autocomplete-delta:'
+# changes a process replays at most, more of them are reloaded
+DELTA_LOG_SIZE = 1000
+# seconds a logged change is kept
+DELTA_TIMEOUT = 60 * 60
+USER_FIELDS = ('id', 'username', 'first_name', 'last_name')
+# user fields changing the index, logins only save last_login
+USER_INDEXED_FIELDS = {*USER_FIELDS[1:], 'is_active'}
+
+
+class PrefixIndex:
+    """
+    Sorted (key, pk) pairs of the indexed objects.
+
+    Items are dicts of the fields of an object, the first field is the
+    id, every other one is a key.
+    """
+
+    def __init__(self, name, queryset, fields):
+        self.name = name
+        self.version_key = VERSION_KEY_PREFIX + name
+        # callable returning the indexed objects
+        self.queryset = queryset
+        self.fields = fields
+        self._keys = []
+        self._entries = {}
+        self._version = None
+        self._reloading = False
+        self._lock = threading.Lock()
+
+    def _current_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            # start from the clock, so a lost version is never reused;
+            # an expiring version makes a private cache reload the index
+            cache.add(self.version_key, int(time.time() * 1000),
+                      AUTOCOMPLETE_RELOAD)
+            version = cache.get(self.version_key)
+        return version
+
+    def _delta_key(self, version):
+        return f'{DELTA_KEY_PREFIX}{self.name}:{version}'
+
+    def _entry(self, values):
+        """Return the item and the keys of field values"""
+        item = dict(zip(self.fields, values))
+        keys = {normalize(value) for field, value in item.items()
+                if field != 'id' and value}
+        return item, tuple(sorted(keys))
+
+    def _load(self):
+        try:
+            # read before the rows: changes made meanwhile are replayed
+            version = self._current_version()
+            keys, entries = [], {}
+            for values in self.queryset().values_list(
+                *self.fields
+            ).iterator():
+                item, item_keys = entries[values[0]] = self._entry(values)
+                keys += [(key, item['id']) for key in item_keys]
+            keys.sort()
+            with self._lock:
+                self._keys, self._entries = keys, entries
+                self._version = version
+        finally:
+            self._reloading = False
+
+    def _replay(self, version):
+        """Apply the logged changes up to version, False on a gap"""
+        start = self._version
+        if not 0 < version - start <= DELTA_LOG_SIZE:
+            return False
+        keys = [self._delta_key(v) for v in range(start + 1, version + 1)]
+        deltas = cache.get_many(keys)
+        if len(deltas) < len(keys):
+            return False
+        with self._lock:
+            if self._version != start:
+                # replayed by another thread meanwhile
+                return True
+            for key in keys:
+                pk, entry = deltas[key]
+                self._remove(pk)
+                if entry is not None:
+                    self._insert(pk, entry)
+            self._version = version
+        return True
+
+    def _sync(self):
+        version = self._current_version()
+        if version == self._version:
+            return
+        if self._version is None:
+            # first lookup of the process, nothing to serve meanwhile
+            self._load()
+            return
+        if self._reloading or self._replay(version):
+            return
+        with self._lock:
+            reload, self._reloading = not self._reloading, True
+        if reload:
+            run_in_background(self._load)
+
+    def search(self, prefix, limit):
+        """Items having a key starting with prefix, by key"""
+        self._sync()
+        prefix = normalize(prefix.strip())
+        if not prefix:
+            return []
+        found = {}
+        with self._lock:
+            keys = self._keys
+            position = bisect.bisect_left(keys, (prefix,))
+            while (position < len(keys) and len(found) < limit
+                   and keys[position][0].startswith(prefix)):
+                pk = keys[position][1]
+                found.setdefault(pk, self._entries[pk][0])
+                position += 1
+        return list(found.values())
+
+    def get(self, pk):
+        """Item of the object with the pk, None if there is no such"""
+        self._sync()
+        entry = self._entries.get(pk)
+        return entry[0] if entry else None
+
+    def _remove(self, pk):
+        _, keys = self._entries.pop(pk, (None, ()))
+        for key in keys:
+            position = bisect.bisect_left(self._keys, (key, pk))
+            if self._keys[position:position + 1] == [(key, pk)]:
+                del self._keys[position]
+
+    def _insert(self, pk, entry):
+        self._entries[pk] = entry
+        for key in entry[1]:
+            bisect.insort(self._keys, (key, pk))
+
+    def _log(self, pk, entry):
+        """Bump the version, log the entry of pk under the new one"""
+        try:
+            version = cache.incr(self.version_key)
+        except ValueError:
+            # missing version is recreated on the next lookup, a gap
+            return
+        cache.set(self._delta_key(version), (pk, entry), DELTA_TIMEOUT)
+
+    def _unchanged(self, pk, entry):
+        """Whether the up to date index already has the entry"""
+        return (self._entries.get(pk) == entry
+                and self._version == self._current_version())
+
+    def put(self, instance):
+        """Add or replace the object"""
+        pk = instance.pk
+        entry = self._entry([getattr(instance, f) for f in self.fields])
+        self._change(pk, entry)
+
+    def remove(self, pk):
+        """Drop the object"""
+        self._change(pk, None)
+
+    def _change(self, pk, entry):
+        if self._unchanged(pk, entry):
+            # nothing shown has changed, other processes keep their index
+            return
+        self._log(pk, entry)
+        # log again after commit, in case another process reloaded the
+        # index before the transaction was committed
+        transaction.on_commit(lambda: self._log(pk, entry))
+
+
+users = PrefixIndex(
+    'users', lambda: User.objects.filter(is_active=True), USER_FIELDS
+)
+groups = PrefixIndex('groups', Group.objects.all, ('id', 'slug', 'title'))
+INDEXES = {'users': users, 'groups': groups}
@@ -0,0 +1,50 @@
+"""
+Bulk writes keeping denormalized data in sync.
+
+bulk_create() sends no post_save, so bulk_insert() sends bulk_created
+with all new objects and posts.signals updates feeds, stats and caches
+once per batch. bulk_delete() does the same with bulk_deleted instead of
+a post_delete per object.
+"""
+from django.db import transaction
+from django.db.models import Max
+from django.dispatch import Signal
+
+# sent with instances: list of the created objects, pks set
+bulk_created = Signal(providing_args=['instances'])
+# sent with instances: list of the deleted objects
+bulk_deleted = Signal(providing_args=['instances'])
+
+
+def bulk_insert(model, objs):
+    """Insert objs in one transaction, return them with pks set"""
+    with transaction.atomic():
+        objs = model.objects.bulk_create(objs)
+        if objs and objs[0].pk is None:
+            # the backend does not return ids (SQLite), rows of one
+            # transaction got consecutive ones ending with the largest
+            last = model.objects.aggregate(last=Max('pk'))['last']
+            for pk, obj in enumerate(objs, last - len(objs) + 1):
+                obj.pk = pk
+        bulk_created.send(sender=model, instances=objs)
+    return objs
+
+
+def bulk_delete(queryset):
+    """
+    Delete rows of queryset with one query, return the deleted objects.
+
+    No cascades and no post_delete: only for models nothing refers to.
+    """
+    model = queryset.model
+    with transaction.atomic():
+        objs = list(queryset)
+        if objs:
+            # delete() would collect the rows and send post_delete for
+            # each; _raw_delete() is private Django API, the version is
+            # pinned in requirements.txt and test_follow covers this
+            model.objects.filter(
+                pk__in=[obj.pk for obj in objs]
+            )._raw_delete(queryset.db)
+            bulk_deleted.send(sender=model, instances=objs)
+    return objs
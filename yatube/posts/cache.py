@@ -0,0 +1,94 @@
+"""
+Versioned cache namespace of posts feeds.
+
+Fragment cache keys of feed pages include the versions of their scopes,
+whole anonymous pages are tagged with them (see posts.middleware).
+Writes bump the versions instead of deleting keys, so a page shows
+changes at once while unchanged pages stay cached for hours.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.middleware.csrf import get_token
+
+from yatube.settings import FEED_CACHE_TIMEOUT
+
+VERSION_KEY_PREFIX = 'feed-version:'
+# scope bumped by changes visible on every feed page
+GLOBAL_SCOPE = 'all'
+
+
+def _version_key(scope):
+    return VERSION_KEY_PREFIX + scope
+
+
+def feed_version(*scopes):
+    """Return the combined version of the global and given scopes"""
+    keys = [_version_key(scope) for scope in (GLOBAL_SCOPE, *scopes)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # start from the clock, so a lost version is never reused
+            cache.add(key, int(time.time() * 1000), None)
+            versions[key] = cache.get(key)
+    return '.'.join(str(versions[key]) for key in keys)
+
+
+def _bump(scopes):
+    for scope in scopes:
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            # missing version is recreated on the next read
+            pass
+
+
+def bump_feed_version(*scopes):
+    """Invalidate cached fragments of the given scopes"""
+    _bump(scopes)
+    # bump again after commit, in case a reader cached the old rows
+    # under the new version before the transaction was committed
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def post_scopes(post):
+    """Feed cache scopes of the pages showing the post"""
+    scopes = {'index', f'post:{post.pk}', f'author:{post.author_id}'}
+    for group_id in (post.group_id, getattr(post, '_saved_group_id', None)):
+        if group_id is not None:
+            scopes.add(f'group:{group_id}')
+    return scopes
+
+
+def _visitor(request):
+    """Part of the ETag telling visitors and their logins apart"""
+    if not request.user.is_authenticated:
+        return None
+    # pages of users carry the csrf token, which is rotated on login;
+    # get_token() makes sure the cookie is set on this response
+    get_token(request)
+    return f'{request.user.pk}:{request.META["CSRF_COOKIE"]}'
+
+
+def feed_etag(*scopes, request=None):
+    """ETag of a response showing the scopes, personal when request is set"""
+    visitor = _visitor(request) if request is not None else None
+    version = feed_version(*scopes)
+    return hashlib.md5(f'{visitor}:{version}'.encode()).hexdigest()
+
+
+def feed_cache_context(*scopes):
+    """Context for {% cache %} blocks of a feed page"""
+    return {
+        'feed_version': feed_version(*scopes),
+        'feed_cache_timeout': FEED_CACHE_TIMEOUT,
+    }
+
+
+def tag_page(request, *scopes):
+    """Mark the response with the scopes of entities shown on it"""
+    request.page_cache_scopes = (
+        getattr(request, 'page_cache_scopes', set()) | set(scopes)
+    )
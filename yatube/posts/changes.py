@@ -0,0 +1,45 @@
+"""
+Change log of posts, comments and follows for incremental sync.
+
+Signal handlers append a Change row per write, deletes leave tombstones.
+Clients read the log after the id of the last change they have seen.
+Ids grow with inserts. SQLite commits writers one at a time; on other
+databases a transaction may commit after one holding a higher id, and a
+client whose token has passed that id misses the change for good.
+"""
+from django.db.models import Q
+
+from posts.models import Change
+
+# model name: change kind
+KINDS = {
+    'post': Change.POST,
+    'comment': Change.COMMENT,
+    'follow': Change.FOLLOW,
+}
+
+
+def record(action, *instances):
+    """Append a change of every instance"""
+    Change.objects.bulk_create(
+        Change(
+            kind=KINDS[instance._meta.model_name],
+            object_id=instance.pk,
+            action=action,
+            # follows are private, only their user reads them
+            owner_id=getattr(instance, 'user_id', None),
+        )
+        for instance in instances
+    )
+
+
+def read(since, user_id, limit):
+    """
+    Return changes after the since id visible to the user, at most
+    limit of them, and whether there are more. A change committed late
+    with an id below since is not returned (see the module docstring).
+    """
+    changes = list(Change.objects.filter(
+        Q(owner_id__isnull=True) | Q(owner_id=user_id), id__gt=since
+    )[:limit + 1])
+    return changes[:limit], len(changes) > limit
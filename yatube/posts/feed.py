@@ -0,0 +1,86 @@
+"""
+Materialized follow feed (fan-out-on-write).
+
+Every follower has its own list of FeedEntry rows, so the follow page
+reads one indexed range instead of joining Post and Follow. New posts
+are pushed to followers in background. A new follow copies only the
+newest FEED_BACKFILL_POSTS posts of the author; follows of many authors
+at once are copied in background.
+"""
+from itertools import islice
+
+from core.tasks import run_in_background
+from posts.cache import bump_feed_version
+from posts.models import FeedEntry, Follow, Post
+from yatube.settings import FEED_BACKFILL_POSTS
+
+# number of feed rows inserted by one query
+FAN_OUT_BATCH_SIZE = 500
+
+
+def _bulk_insert(entries):
+    """Insert entries chunk by chunk, skipping the ones already in feed"""
+    entries = iter(entries)
+    while True:
+        chunk = list(islice(entries, FAN_OUT_BATCH_SIZE))
+        if not chunk:
+            break
+        FeedEntry.objects.bulk_create(chunk, ignore_conflicts=True)
+
+
+def fan_out_posts(posts):
+    """Push many new posts into the feeds of their authors' followers"""
+    followers = {}
+    for user_id, author_id in Follow.objects.filter(
+        author_id__in={post.author_id for post in posts}
+    ).values_list('user_id', 'author_id'):
+        followers.setdefault(author_id, []).append(user_id)
+    _bulk_insert(
+        FeedEntry(user_id=user_id, post_id=post.pk, pub_date=post.pub_date)
+        for post in posts for user_id in followers.get(post.author_id, ())
+    )
+
+
+def _fan_out_task(*post_ids):
+    # posts deleted meanwhile are not pushed; in_bulk() batches the ids
+    posts = Post.objects.only('author', 'pub_date').in_bulk(post_ids)
+    fan_out_posts(list(posts.values()))
+
+
+def schedule_fan_out(*posts):
+    """Push new posts into the feeds of followers in background"""
+    run_in_background(_fan_out_task, *(post.pk for post in posts))
+
+
+def _newest_posts(author_id):
+    # a short range of the (author, -pub_date, -id) index
+    return Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-pk'
+    ).values_list('pk', 'pub_date')[:FEED_BACKFILL_POSTS]
+
+
+def backfill(user_id, *author_ids):
+    """Copy the newest posts of followed authors into the user's feed"""
+    _bulk_insert(
+        FeedEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for author_id in author_ids
+        for post_id, pub_date in _newest_posts(author_id)
+    )
+
+
+def _backfill_task(user_id, *author_ids):
+    backfill(user_id, *author_ids)
+    # the follow page may have been cached before the posts were copied
+    bump_feed_version(f'follows:{user_id}')
+
+
+def schedule_backfill(user_id, *author_ids):
+    """Copy the newest posts of followed authors in background"""
+    run_in_background(_backfill_task, user_id, *author_ids)
+
+
+def remove_author(user_id, *author_ids):
+    """Drop all posts of unfollowed authors from the user's feed"""
+    FeedEntry.objects.filter(
+        user_id=user_id, post__author_id__in=author_ids
+    ).delete()
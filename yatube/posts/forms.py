@@ -1,8 +1,78 @@
+from functools import partial
+
 from django import forms
+from django.forms.utils import flatatt
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as _
 
+from posts import autocomplete, uploads
 from posts.models import Post, Comment
 
+# fills the datalist of a search box from the autocomplete endpoint and
+# keeps the id of the chosen item in the hidden input before the box
+AUTOCOMPLETE_SCRIPT = mark_safe('''
+(function (input) {
+  var hidden = input.previousElementSibling;
+  var list = input.nextElementSibling;
+  var ids = {};
+  input.addEventListener('input', function () {
+    hidden.value = ids[input.value] || '';
+    if (!input.value) { return; }
+    var url = input.dataset.url + '&q=' + encodeURIComponent(input.value);
+    fetch(url).then(function (response) {
+      return response.json();
+    }).then(function (data) {
+      list.innerHTML = '';
+      data[input.dataset.kind].forEach(function (item) {
+        var option = document.createElement('option');
+        option.value = item[input.dataset.label];
+        ids[option.value] = item.id;
+        list.appendChild(option);
+      });
+      hidden.value = ids[input.value] || '';
+    });
+  });
+})(document.currentScript.previousElementSibling.previousElementSibling);
+''')
+
+
+class AutocompleteInput(forms.Widget):
+    """
+    Search box completing names from the autocomplete endpoint.
+
+    The chosen id goes to a hidden input, so no choice list is rendered
+    and the name of the current value is read from the in-memory index.
+    """
+
+    def __init__(self, index, label_field, attrs=None):
+        super().__init__(attrs)
+        self.index = index
+        self.label_field = label_field
+
+    def render(self, name, value, attrs=None, renderer=None):
+        attrs = self.build_attrs(self.attrs, attrs)
+        input_id = attrs.setdefault('id', f'id_{name}')
+        try:
+            item = self.index.get(int(value))
+        except (TypeError, ValueError):
+            item = None
+        url = reverse('autocomplete') + '?' + urlencode(
+            {'kind': self.index.name}
+        )
+        return format_html(
+            '<input type="hidden" name="{}" value="{}" id="{}_value">'
+            '<input type="search" autocomplete="off" list="{}_list" '
+            'value="{}" data-url="{}" data-kind="{}" data-label="{}"{}>'
+            '<datalist id="{}_list"></datalist><script>{}</script>',
+            name, self.format_value(value) or '', input_id,
+            input_id, item[self.label_field] if item else '', url,
+            self.index.name, self.label_field, flatatt(attrs),
+            input_id, AUTOCOMPLETE_SCRIPT,
+        )
+
 
 class PostForm(forms.ModelForm):
     class Meta:
@@ -12,6 +82,23 @@ class PostForm(forms.ModelForm):
             'text': _('Текст нового поста'),
             'group': _('Группа, к которой будет относиться пост')
         }
+        widgets = {
+            'group': AutocompleteInput(autocomplete.groups, 'slug'),
+        }
+
+    def __init__(self, *args, stopped_uploads=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        # file fields of the request not read for their size
+        self.stopped_uploads = stopped_uploads
+        # header checks only, the image is decoded in background; the
+        # field stays a plain ImageField, as tests/test_create.py expects
+        image = self.fields['image']
+        image.to_python = partial(uploads.image_to_python, image)
+
+    def clean_image(self):
+        if 'image' in self.stopped_uploads:
+            raise uploads.too_large()
+        return self.cleaned_data['image']
 
 
 class CommentForm(forms.ModelForm):
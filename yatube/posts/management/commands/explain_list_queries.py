@@ -0,0 +1,61 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from posts.models import Comment, FeedEntry, Follow, Mention, Post, PostTag
+from posts.paginator import CursorPaginator
+from yatube.settings import POSTS_PER_PAGE
+
+# plan lines of a full table scan or of sorting rows in memory (SQLite)
+BAD_PLAN = re.compile(r'SCAN( TABLE)? \w+$|USE TEMP B-TREE', re.MULTILINE)
+
+
+class Command(BaseCommand):
+    help = 'Print query plans of the list views to spot missing indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Fail if a plan scans a whole table or sorts in memory'
+        )
+
+    def list_queries(self):
+        """Yield (name, queryset) for the first and a deep page of lists"""
+        deep = CursorPaginator.encode_cursor(False, (timezone.now(), 1))
+        paginated = (
+            ('index', Post.objects.for_list(), ('pub_date', 'pk')),
+            ('group_posts', Post.objects.filter(group_id=1).for_list(),
+             ('pub_date', 'pk')),
+            ('profile', Post.objects.filter(author_id=1).for_list(),
+             ('pub_date', 'pk')),
+            ('follow_index', FeedEntry.objects.filter(user_id=1).for_list(),
+             ('pub_date', 'post_id')),
+            ('tag_posts', PostTag.objects.filter(tag_id=1).for_list(),
+             ('pub_date', 'pk')),
+            ('mentions', Mention.objects.filter(user_id=1).for_list(),
+             ('pub_date', 'pk')),
+        )
+        for name, queryset, fields in paginated:
+            paginator = CursorPaginator(queryset, POSTS_PER_PAGE, fields)
+            yield name, paginator.get_queryset(None)
+            yield f'{name} (deep page)', paginator.get_queryset(deep)
+        yield 'post_detail comments', Comment.objects.filter(
+            post_id=1
+        ).for_list()
+        yield 'follows by user', Follow.objects.filter(
+            user_id=1
+        ).order_by('-id')
+
+    def handle(self, *args, **options):
+        failed = []
+        for name, queryset in self.list_queries():
+            plan = queryset.explain()
+            self.stdout.write(f'== {name}\n{plan}\n')
+            if connection.vendor == 'sqlite' and BAD_PLAN.search(plan):
+                failed.append(name)
+        if options['check'] and failed:
+            raise CommandError(
+                'Queries without a matching index: ' + ', '.join(failed)
+            )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts import tags
+from posts.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Rebuild hashtags and mentions of existing posts and comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int,
+                            default=tags.BATCH_SIZE,
+                            help='Number of texts indexed at once')
+
+    def handle(self, *args, **options):
+        for model in (Post, Comment):
+            total = tags.backfill(model, options['chunk_size'])
+            self.stdout.write(
+                f'Indexed {total} {model._meta.verbose_name_plural}'
+            )
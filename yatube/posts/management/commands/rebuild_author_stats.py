@@ -0,0 +1,27 @@
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+
+from posts import stats
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Recount post, comment, follower and following counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500,
+                            help='Number of users recounted at once')
+
+    def handle(self, *args, **options):
+        user_ids = User.objects.order_by('pk').values_list(
+            'pk', flat=True
+        ).iterator()
+        total = 0
+        while True:
+            chunk = list(islice(user_ids, options['chunk_size']))
+            if not chunk:
+                break
+            stats.rebuild(chunk)
+            total += len(chunk)
+        self.stdout.write(f'Rebuilt stats of {total} users')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts import uploads
+
+
+class Command(BaseCommand):
+    help = 'Verify post images left unverified by lost background tasks'
+
+    def handle(self, *args, **options):
+        total = uploads.verify_pending()
+        self.stdout.write(f'Verified {total} images')
@@ -0,0 +1,65 @@
+"""
+Whole page cache for anonymous visitors
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+
+from posts.cache import feed_version
+from yatube.settings import PAGE_CACHE_TIMEOUT
+
+PAGE_KEY_PREFIX = 'page:'
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Serve cookie-less GET requests from cache.
+
+    Only responses tagged by posts.cache.tag_page are stored, together
+    with the versions of their scopes; a write bumping any of the
+    versions purges just the pages showing the changed entities.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def cache_key(request):
+        path = request.get_full_path().encode()
+        return PAGE_KEY_PREFIX + hashlib.md5(path).hexdigest()
+
+    def __call__(self, request):
+        # any cookie may be a session, so the page may be personal
+        if request.method != 'GET' or request.COOKIES:
+            return self.get_response(request)
+
+        key = self.cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            scopes, version, content, headers = entry
+            if feed_version(*scopes) == version:
+                response = HttpResponse(content)
+                # headers of inner middleware too, X-Frame-Options etc.
+                for name, value in headers:
+                    response[name] = value
+                response['X-Page-Cache'] = 'hit'
+                etag = response.get('ETag')
+                if etag is None:
+                    return response
+                return get_conditional_response(request, etag=etag,
+                                                response=response)
+
+        response = self.get_response(request)
+        scopes = getattr(request, 'page_cache_scopes', None)
+        if (scopes and response.status_code == 200
+                and not response.streaming and not response.cookies):
+            scopes = sorted(scopes)
+            cache.set(
+                key,
+                (scopes, feed_version(*scopes), response.content,
+                 list(response.items())),
+                PAGE_CACHE_TIMEOUT,
+            )
+        return response
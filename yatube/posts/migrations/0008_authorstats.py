@@ -0,0 +1,55 @@
+# Generated by Django 2.2.16 on 2026-10-17 06:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_stats(apps, schema_editor):
+    """Count stats of the users existing before this migration"""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+    stats = {
+        pk: AuthorStats(user_id=pk)
+        for pk in User.objects.values_list('pk', flat=True)
+    }
+    counters = (
+        ('posts_count', 'Post', 'author'),
+        ('comments_count', 'Comment', 'author'),
+        ('followers_count', 'Follow', 'author'),
+        ('following_count', 'Follow', 'user'),
+    )
+    for counter, model_name, field in counters:
+        model = apps.get_model('posts', model_name)
+        rows = model.objects.values_list(field).annotate(
+            total=models.Count('pk')
+        ).order_by()
+        for user_id, total in rows:
+            setattr(stats[user_id], counter, total)
+    AuthorStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0007_feedentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Постов')),
+                ('comments_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Подписчиков')),
+                ('following_count', models.PositiveIntegerField(default=0, verbose_name='Подписок')),
+            ],
+            options={
+                'verbose_name': 'Author stats',
+                'verbose_name_plural': 'Author stats',
+            },
+        ),
+        migrations.RunPython(fill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:08
+
+from django.db import migrations, models
+
+
+def fill_changes(apps, schema_editor):
+    """Log rows existing before this migration as created"""
+    Change = apps.get_model('posts', 'Change')
+    for kind, model_name in (('post', 'Post'), ('comment', 'Comment'),
+                             ('follow', 'Follow')):
+        model = apps.get_model('posts', model_name)
+        # follows are private to their user
+        owner = 'user_id' if kind == 'follow' else None
+        rows = model.objects.order_by('pk').iterator()
+        Change.objects.bulk_create(
+            (Change(kind=kind, object_id=row.pk, action='created',
+                    owner_id=getattr(row, owner) if owner else None)
+             for row in rows),
+            batch_size=500,
+        )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_list_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('post', 'Пост'), ('comment', 'Комментарий'), ('follow', 'Подписка')], max_length=16, verbose_name='Тип')),
+                ('object_id', models.PositiveIntegerField(verbose_name='ID объекта')),
+                ('action', models.CharField(choices=[('created', 'Создан'), ('updated', 'Изменён'), ('deleted', 'Удалён')], max_length=16, verbose_name='Действие')),
+                ('owner_id', models.PositiveIntegerField(blank=True, null=True, verbose_name='ID владельца')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата изменения')),
+            ],
+            options={
+                'verbose_name': 'Change',
+                'verbose_name_plural': 'Changes',
+                'ordering': ('id',),
+            },
+        ),
+        migrations.RunPython(fill_changes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+from django.db import migrations
+
+# texts are indexed with "ё" folded, see posts.search
+FOLD = "replace(replace({}, 'ё', 'е'), 'Ё', 'Е')"
+
+# triggers keeping the FTS5 index in sync with the table; SQLite drops
+# them when Django rebuilds the table to alter it, see 0014
+TRIGGERS_SQL = (
+    f"""CREATE TRIGGER {{table}}_fts_insert AFTER INSERT ON {{table}} BEGIN
+        INSERT INTO {{table}}_fts(rowid, text)
+        VALUES (new.id, {FOLD.format('new.text')});
+    END""",
+    f"""CREATE TRIGGER {{table}}_fts_delete AFTER DELETE ON {{table}} BEGIN
+        INSERT INTO {{table}}_fts({{table}}_fts, rowid, text)
+        VALUES ('delete', old.id, {FOLD.format('old.text')});
+    END""",
+    f"""CREATE TRIGGER {{table}}_fts_update AFTER UPDATE OF text ON {{table}}
+    BEGIN
+        INSERT INTO {{table}}_fts({{table}}_fts, rowid, text)
+        VALUES ('delete', old.id, {FOLD.format('old.text')});
+        INSERT INTO {{table}}_fts(rowid, text)
+        VALUES (new.id, {FOLD.format('new.text')});
+    END""",
+)
+
+# FTS5 index of <table>.text
+FTS_SQL = (
+    """CREATE VIRTUAL TABLE {table}_fts USING fts5(
+        text, content='{table}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    *TRIGGERS_SQL,
+    f"""INSERT INTO {{table}}_fts(rowid, text)
+    SELECT id, {FOLD.format('text')} FROM {{table}}""",
+)
+
+DROP_SQL = (
+    'DROP TRIGGER IF EXISTS {table}_fts_update',
+    'DROP TRIGGER IF EXISTS {table}_fts_delete',
+    'DROP TRIGGER IF EXISTS {table}_fts_insert',
+    'DROP TABLE IF EXISTS {table}_fts',
+)
+
+TABLES = ('posts_post', 'posts_comment')
+
+
+def run(statements, tables=TABLES):
+    def operation(apps, schema_editor):
+        # other databases search with icontains
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for table in tables:
+            for statement in statements:
+                schema_editor.execute(statement.format(table=table))
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_change'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(FTS_SQL), run(DROP_SQL)),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:23
+
+import math
+from datetime import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+from yatube.settings import TRENDING_HALF_LIFE
+
+
+def fill_scores(apps, schema_editor):
+    """Score the posts commented before this migration, see posts.trending"""
+    Comment = apps.get_model('posts', 'Comment')
+    TrendingScore = apps.get_model('posts', 'TrendingScore')
+    decay = math.log(2) / TRENDING_HALF_LIFE
+    epoch = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    sums = {}
+    comments = Comment.objects.values_list('post_id', 'created').iterator()
+    for post_id, created in comments:
+        weight = decay * (created - epoch).total_seconds()
+        if post_id in sums:
+            # log(exp(score) + exp(weight)) without overflow
+            high, low = max(sums[post_id], weight), min(sums[post_id], weight)
+            weight = high + math.log1p(math.exp(low - high))
+        sums[post_id] = weight
+    TrendingScore.objects.bulk_create(
+        (TrendingScore(post_id=post_id, score=score)
+         for post_id, score in sums.items()),
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_tags'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('score', models.FloatField(verbose_name='Рейтинг')),
+            ],
+            options={
+                'verbose_name': 'Trending score',
+                'verbose_name_plural': 'Trending scores',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trendingscore',
+            index=models.Index(fields=['-score'], name='trending_score_idx'),
+        ),
+        migrations.RunPython(fill_scores, migrations.RunPython.noop),
+    ]
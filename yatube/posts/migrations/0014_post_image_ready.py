@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-17 07:25
+from importlib import import_module
+
+from django.db import migrations, models
+
+search = import_module('posts.migrations.0011_search')
+
+# the rebuild of posts_post by SQLite drops its full-text index triggers
+RESTORE_TRIGGERS = search.run(
+    search.DROP_SQL[:3] + search.TRIGGERS_SQL, tables=('posts_post',)
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_trendingscore'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, RESTORE_TRIGGERS),
+        migrations.AddField(
+            model_name='post',
+            name='image_ready',
+            field=models.BooleanField(default=True, verbose_name='Картинка проверена'),
+        ),
+        migrations.RunPython(RESTORE_TRIGGERS, migrations.RunPython.noop),
+    ]
@@ -20,6 +20,16 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    """Posts queryset shared by HTML views and API"""
+    # relations rendered on every row of a posts list
+    list_related = ('author', 'group')
+
+    def for_list(self):
+        """Load related data of list rows up front"""
+        return self.select_related(*self.list_related)
+
+
 class Post(models.Model):
     """Post model"""
     text = models.TextField(
@@ -48,17 +58,38 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    # false until a new image is verified in background, see posts.uploads
+    image_ready = models.BooleanField('Картинка проверена', default=True)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         """metaclass for Post model"""
         verbose_name = 'Text post'
         verbose_name_plural = 'Text posts'
         ordering = ('-pub_date',)
+        # match the (pub_date, id) seek of posts lists
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'],
+                         name='post_pub_date_idx'),
+            models.Index(fields=['author', '-pub_date', '-id'],
+                         name='post_author_pub_date_idx'),
+            models.Index(fields=['group', '-pub_date', '-id'],
+                         name='post_group_pub_date_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
 
 
+class CommentQuerySet(models.QuerySet):
+    """Comments queryset shared by HTML views and API"""
+
+    def for_list(self):
+        """Load comment authors up front"""
+        return self.select_related('author')
+
+
 class Comment(models.Model):
     """Comment model"""
     post = models.ForeignKey(
@@ -80,11 +111,17 @@ class Comment(models.Model):
     created = models.DateTimeField(verbose_name='Дата публикации',
                                    auto_now_add=True)
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         """metaclass for Comment model"""
         verbose_name = 'Post comment'
         verbose_name_plural = 'Post comments'
         ordering = ('-created',)
+        indexes = [
+            models.Index(fields=['post', '-created', '-id'],
+                         name='comment_post_created_idx'),
+        ]
 
     def __str__(self):
         return self.text[:15]
@@ -121,3 +158,253 @@ class Follow(models.Model):
 
     def __str__(self):
         return str(self.user) + " follows " + str(self.author)
+
+
+class FeedEntryQuerySet(models.QuerySet):
+
+    def for_list(self):
+        """Load feed posts with their list relations up front"""
+        return self.select_related('post', *(
+            f'post__{name}' for name in PostQuerySet.list_related
+        ))
+
+
+class FeedEntry(models.Model):
+    """Materialized follow feed entry (fan-out-on-write)"""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Пользователь',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Пост',
+    )
+    # copy of post.pub_date, so a feed page is read from this table only
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    objects = FeedEntryQuerySet.as_manager()
+
+    class Meta:
+        """metaclass for FeedEntry model"""
+        verbose_name = 'Feed entry'
+        verbose_name_plural = 'Feed entries'
+        ordering = ('-pub_date', '-post')
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "post"], name="unique_user_post_entry"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "-pub_date", "-post"],
+                         name="feed_user_pub_date_idx"),
+        ]
+
+    def __str__(self):
+        return str(self.post_id) + " in feed of " + str(self.user)
+
+
+class AuthorStats(models.Model):
+    """Denormalized user counters, see posts.stats"""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь',
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Постов', default=0
+    )
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Комментариев', default=0
+    )
+    followers_count = models.PositiveIntegerField(
+        verbose_name='Подписчиков', default=0
+    )
+    following_count = models.PositiveIntegerField(
+        verbose_name='Подписок', default=0
+    )
+
+    class Meta:
+        """metaclass for AuthorStats model"""
+        verbose_name = 'Author stats'
+        verbose_name_plural = 'Author stats'
+
+    def __str__(self):
+        return "stats of " + str(self.user)
+
+
+class Change(models.Model):
+    """Append-only log of writes, see posts.changes"""
+    POST = 'post'
+    COMMENT = 'comment'
+    FOLLOW = 'follow'
+    KINDS = (
+        (POST, 'Пост'),
+        (COMMENT, 'Комментарий'),
+        (FOLLOW, 'Подписка'),
+    )
+    CREATED = 'created'
+    UPDATED = 'updated'
+    DELETED = 'deleted'
+    ACTIONS = (
+        (CREATED, 'Создан'),
+        (UPDATED, 'Изменён'),
+        (DELETED, 'Удалён'),
+    )
+    kind = models.CharField(max_length=16, choices=KINDS,
+                            verbose_name='Тип')
+    object_id = models.PositiveIntegerField(verbose_name='ID объекта')
+    action = models.CharField(max_length=16, choices=ACTIONS,
+                              verbose_name='Действие')
+    # user owning a private object (follow), empty for public ones; not
+    # a foreign key, tombstones are written while the user is deleted
+    owner_id = models.PositiveIntegerField(null=True, blank=True,
+                                           verbose_name='ID владельца')
+    created = models.DateTimeField(auto_now_add=True,
+                                   verbose_name='Дата изменения')
+
+    class Meta:
+        """metaclass for Change model"""
+        verbose_name = 'Change'
+        verbose_name_plural = 'Changes'
+        ordering = ('id',)
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id} {self.action}'
+
+
+class Tag(models.Model):
+    """Hashtag, see posts.tags"""
+    name = models.CharField(max_length=64, unique=True,
+                            verbose_name='Тег')
+
+    class Meta:
+        """metaclass for Tag model"""
+        verbose_name = 'Tag'
+        verbose_name_plural = 'Tags'
+
+    def __str__(self):
+        return '#' + self.name
+
+
+class ReferenceQuerySet(models.QuerySet):
+
+    def for_list(self):
+        """Load referencing posts with their list relations up front"""
+        return self.select_related('post', 'comment__author', *(
+            f'post__{name}' for name in PostQuerySet.list_related
+        ))
+
+
+class PostTag(models.Model):
+    """Hashtag found in the text of a post or of one of its comments"""
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='entries',
+        verbose_name='Тег',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='tag_entries',
+        verbose_name='Пост',
+    )
+    # empty when the tag is in the post text itself
+    comment = models.ForeignKey(
+        Comment,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='tag_entries',
+        verbose_name='Комментарий',
+    )
+    # copy of post.pub_date or comment.created, a tag page is read from
+    # this table only
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    objects = ReferenceQuerySet.as_manager()
+
+    class Meta:
+        """metaclass for PostTag model"""
+        verbose_name = 'Post tag'
+        verbose_name_plural = 'Post tags'
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(fields=['tag', '-pub_date', '-id'],
+                         name='post_tag_pub_date_idx'),
+        ]
+
+    def __str__(self):
+        return str(self.tag) + " in " + str(self.post_id)
+
+
+class Mention(models.Model):
+    """@username found in the text of a post or of one of its comments"""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        verbose_name='Пользователь',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        verbose_name='Пост',
+    )
+    # empty when the mention is in the post text itself
+    comment = models.ForeignKey(
+        Comment,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+        verbose_name='Комментарий',
+    )
+    # copy of post.pub_date or comment.created
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    objects = ReferenceQuerySet.as_manager()
+
+    class Meta:
+        """metaclass for Mention model"""
+        verbose_name = 'Mention'
+        verbose_name_plural = 'Mentions'
+        ordering = ('-pub_date', '-id')
+        indexes = [
+            models.Index(fields=['user', '-pub_date', '-id'],
+                         name='mention_user_pub_date_idx'),
+        ]
+
+    def __str__(self):
+        return str(self.user) + " in " + str(self.post_id)
+
+
+class TrendingScore(models.Model):
+    """Decayed comment velocity of a post, see posts.trending"""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='Пост',
+    )
+    # logarithm of the sum of the comment weights
+    score = models.FloatField(verbose_name='Рейтинг')
+
+    class Meta:
+        """metaclass for TrendingScore model"""
+        verbose_name = 'Trending score'
+        verbose_name_plural = 'Trending scores'
+        indexes = [
+            models.Index(fields=['-score'], name='trending_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id}: {self.score}'
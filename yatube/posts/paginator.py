@@ -0,0 +1,160 @@
+"""
+Keyset (cursor) pagination for posts lists, approximate counts for admin
+"""
+import base64
+import binascii
+
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection
+from django.db.models import Max, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from yatube.settings import EXACT_COUNT_LIMIT
+
+
+class CursorPaginator(Paginator):
+    """
+    Paginator seeking on (date, pk) instead of COUNT + OFFSET.
+
+    A cursor holds the key of the edge row of the page it came from and
+    the direction to read in, so every page costs one indexed range scan.
+    Page numbers are relative: the current page is 2 when there is a
+    previous one, num_pages is one more than it when there is a next one.
+    """
+
+    def __init__(self, object_list, per_page,
+                 fields=('pub_date', 'pk')):
+        super().__init__(object_list, per_page)
+        self.date_field, self.pk_field = fields
+        self.cursor = None
+        self.next_cursor = None
+        self.previous_cursor = None
+        self._num_pages = 1
+
+    @property
+    def num_pages(self):
+        return self._num_pages
+
+    @property
+    def last_cursor(self):
+        """Cursor of the last page: read backwards from the end"""
+        return self.encode_cursor(True, None)
+
+    @staticmethod
+    def encode_cursor(reverse, position):
+        if position is None:
+            raw = f'{int(reverse)}||'
+        else:
+            date, pk = position
+            raw = f'{int(reverse)}|{date.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Return (reverse, position), the first page for invalid cursor"""
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            raw = base64.urlsafe_b64decode(cursor + padding).decode()
+            reverse, date, pk = raw.split('|')
+            if not date and not pk:
+                return reverse == '1', None
+            date = parse_datetime(date)
+            if date is None:
+                raise ValueError
+            return reverse == '1', (date, int(pk))
+        except (TypeError, ValueError, binascii.Error):
+            return False, None
+
+    def _key(self, row):
+        return getattr(row, self.date_field), getattr(row, self.pk_field)
+
+    def _seek(self, reverse, position):
+        date, pk = self.date_field, self.pk_field
+        if reverse:
+            queryset = self.object_list.order_by(date, pk)
+            lookup = 'gt'
+        else:
+            queryset = self.object_list.order_by(f'-{date}', f'-{pk}')
+            lookup = 'lt'
+        if position is not None:
+            date_value, pk_value = position
+            # the plain range lets the database seek the index, the OR
+            # alone would be a filtered scan from the start of the list
+            queryset = queryset.filter(
+                **{f'{date}__{lookup}e': date_value}
+            ).filter(
+                Q(**{f'{date}__{lookup}': date_value})
+                | Q(**{date: date_value, f'{pk}__{lookup}': pk_value})
+            )
+        return queryset
+
+    def get_queryset(self, cursor):
+        """Return the query reading the page pointed by cursor"""
+        reverse, position = self.decode_cursor(cursor)
+        # one extra row tells whether there is a page after this one
+        return self._seek(reverse, position)[:self.per_page + 1]
+
+    def get_page(self, cursor):
+        """Return the page pointed by cursor, the first one if it is None"""
+        reverse, position = self.decode_cursor(cursor)
+        rows = list(self.get_queryset(cursor))
+        if not rows and position is not None:
+            # nothing behind the cursor anymore
+            return self.get_page(None)
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+            has_previous, has_next = has_more, position is not None
+        else:
+            has_previous, has_next = position is not None, has_more
+
+        self.cursor = cursor
+        if has_next:
+            self.next_cursor = self.encode_cursor(False, self._key(rows[-1]))
+        if has_previous:
+            self.previous_cursor = self.encode_cursor(True, self._key(rows[0]))
+        number = 2 if has_previous else 1
+        self._num_pages = number + 1 if has_next else number
+        return self._get_page(rows, number, self)
+
+
+def estimate_rows(model):
+    """Row count of the model table from planner statistics, if any"""
+    table = model._meta.db_table
+    queries = {
+        # filled by ANALYZE, the first number is the row count
+        'sqlite': 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+        'postgresql': 'SELECT reltuples FROM pg_class WHERE relname = %s',
+    }
+    if connection.vendor in queries:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(queries[connection.vendor], [table])
+                row = cursor.fetchone()
+        except DatabaseError:
+            row = None
+        if row is not None and int(str(row[0]).split()[0]) > 0:
+            return int(str(row[0]).split()[0])
+    # no statistics: ids grow from 1, gaps of deleted rows are counted
+    return model.objects.aggregate(last=Max('pk'))['last'] or 0
+
+
+class ApproximateCountPaginator(Paginator):
+    """
+    Paginator avoiding COUNT(*) over big tables.
+
+    A whole table is estimated from statistics and counted only when the
+    estimate is small; a filtered list is counted up to EXACT_COUNT_LIMIT
+    rows, so its pages end there.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_rows(queryset.model)
+            if estimate > EXACT_COUNT_LIMIT:
+                return estimate
+        return queryset.order_by().values('pk')[:EXACT_COUNT_LIMIT].count()
@@ -0,0 +1,88 @@
+"""
+Full-text search over posts and comments.
+
+On SQLite the texts are indexed by FTS5 tables (see migration
+0011_search) kept in sync by triggers, so bulk inserts and raw deletes
+are indexed too. Both the index and the queries fold letter case and
+"ё"; query words are cut to a rough stem and matched as prefixes, which
+covers most Russian inflections. Other databases fall back to icontains.
+"""
+import re
+
+from django.db import connection
+
+# FTS5 table indexing the text of a model
+FTS_TABLES = {
+    'posts_post': 'posts_post_fts',
+    'posts_comment': 'posts_comment_fts',
+}
+
+WORD = re.compile(r'\w+')
+# common Russian noun, adjective and verb endings, longest first
+ENDINGS = tuple(sorted((
+    'иями', 'ями', 'ами', 'ого', 'его', 'ому', 'ему', 'ыми', 'ими', 'ешь',
+    'ете', 'ите', 'ать', 'ять', 'ить', 'еть', 'ая', 'яя', 'ое', 'ее', 'ые',
+    'ие', 'ой', 'ей', 'ий', 'ый', 'ом', 'ем', 'ам', 'ям', 'ах', 'ях', 'ов',
+    'ев', 'ую', 'юю', 'ют', 'ут', 'ит', 'ет', 'ы', 'и', 'а', 'я', 'о', 'е',
+    'у', 'ю', 'ь',
+), key=len, reverse=True))
+MIN_STEM = 3
+
+
+def normalize(text):
+    return text.lower().replace('ё', 'е')
+
+
+def stem(word):
+    for ending in ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM:
+            return word[:-len(ending)]
+    return word
+
+
+def terms(query):
+    """Stems of the query words"""
+    return [stem(word) for word in WORD.findall(normalize(query))]
+
+
+def match_expression(query):
+    """FTS5 query matching all words of the query as prefixes"""
+    return ' '.join(f'"{term}"*' for term in terms(query))
+
+
+def _fts(queryset):
+    if connection.vendor != 'sqlite':
+        return None
+    return FTS_TABLES[queryset.model._meta.db_table]
+
+
+def matching(queryset, query, field='text'):
+    """Rows of queryset matching all words of query, in their order"""
+    words = terms(query)
+    if not words:
+        return queryset.none()
+    table = _fts(queryset)
+    if table is None:
+        for word in words:
+            queryset = queryset.filter(**{f'{field}__icontains': word})
+        return queryset
+    return queryset.extra(
+        where=[f'{queryset.model._meta.db_table}.id IN '
+               f'(SELECT rowid FROM {table} WHERE {table} MATCH %s)'],
+        params=[match_expression(query)],
+    )
+
+
+def ranked(queryset, query, field='text'):
+    """Rows of queryset matching query, the most relevant (bm25) first"""
+    table = _fts(queryset)
+    if table is None or not terms(query):
+        return matching(queryset, query, field)
+    db_table = queryset.model._meta.db_table
+    return queryset.extra(
+        tables=[table],
+        where=[f'{table}.rowid = {db_table}.id', f'{table} MATCH %s'],
+        params=[match_expression(query)],
+        select={'search_rank': f'{table}.rank'},
+        order_by=['search_rank'],
+    )
@@ -0,0 +1,194 @@
+"""
+Signal handlers of Posts app keeping denormalized data in sync
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from posts import (autocomplete, changes, feed, stats, tags, trending,
+                   uploads)
+from posts.bulk import bulk_created, bulk_deleted
+from posts.cache import GLOBAL_SCOPE, bump_feed_version, post_scopes
+from posts.thumbnails import schedule_thumbnails
+from posts.models import (AuthorStats, Change, Comment, Follow, Group, Post,
+                          User)
+
+
+@receiver(post_save, sender=User)
+def user_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        AuthorStats.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or update_fields is not None and not (
+        autocomplete.USER_INDEXED_FIELDS & set(update_fields)
+    ):
+        return
+    if instance.is_active:
+        autocomplete.users.put(instance)
+    else:
+        autocomplete.users.remove(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    autocomplete.users.remove(instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+def post_changing(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # remember the group, an edited post may leave its page
+    if instance.pk is not None:
+        (instance._saved_group_id, instance._saved_image,
+         instance._saved_text) = (
+            Post.objects.filter(pk=instance.pk).values_list(
+                'group_id', 'image', 'text'
+            ).first() or (None, None, None)
+        )
+    # a new image is shown once it is verified in background
+    if instance.image and (
+        not instance.image._committed
+        or instance.image.name != getattr(instance, '_saved_image', None)
+    ):
+        instance.image_ready = False
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    changes.record(Change.CREATED if created else Change.UPDATED, instance)
+    if created:
+        feed.schedule_fan_out(instance)
+        stats.bump(instance.author_id, 'posts_count', 1)
+    if created or instance.text != getattr(instance, '_saved_text', None):
+        tags.index([instance], replace=not created)
+    if instance.image and not instance.image_ready:
+        uploads.schedule_verify(instance)
+    bump_feed_version(*post_scopes(instance))
+
+
+@receiver(bulk_created, sender=Post)
+def posts_bulk_created(sender, instances, **kwargs):
+    changes.record(Change.CREATED, *instances)
+    feed.schedule_fan_out(*instances)
+    tags.index(instances, replace=False)
+    stats.bump_many([post.author_id for post in instances],
+                    'posts_count', 1)
+    scopes = set()
+    for post in instances:
+        if post.image:
+            schedule_thumbnails(post)
+        scopes |= post_scopes(post)
+    bump_feed_version(*scopes)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    changes.record(Change.DELETED, instance)
+    stats.bump(instance.author_id, 'posts_count', -1)
+    bump_feed_version(*post_scopes(instance))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, raw=False, **kwargs):
+    # group title and slug are shown on every feed
+    if not raw:
+        bump_feed_version(GLOBAL_SCOPE)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        autocomplete.groups.put(instance)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    autocomplete.groups.remove(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    changes.record(Change.CREATED if created else Change.UPDATED, instance)
+    if created:
+        stats.bump(instance.author_id, 'comments_count', 1)
+        trending.record([instance])
+    tags.index([instance], replace=not created)
+    bump_feed_version(f'comments:{instance.post_id}')
+
+
+@receiver(bulk_created, sender=Comment)
+def comments_bulk_created(sender, instances, **kwargs):
+    changes.record(Change.CREATED, *instances)
+    stats.bump_many([comment.author_id for comment in instances],
+                    'comments_count', 1)
+    tags.index(instances, replace=False)
+    trending.record(instances)
+    bump_feed_version(*{f'comments:{comment.post_id}'
+                        for comment in instances})
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    changes.record(Change.DELETED, instance)
+    stats.bump(instance.author_id, 'comments_count', -1)
+    bump_feed_version(f'comments:{instance.post_id}')
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        changes.record(Change.CREATED, instance)
+        feed.backfill(instance.user_id, instance.author_id)
+        stats.bump(instance.author_id, 'followers_count', 1)
+        stats.bump(instance.user_id, 'following_count', 1)
+        bump_feed_version(f'follows:{instance.user_id}')
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    changes.record(Change.DELETED, instance)
+    feed.remove_author(instance.user_id, instance.author_id)
+    stats.bump(instance.author_id, 'followers_count', -1)
+    stats.bump(instance.user_id, 'following_count', -1)
+    bump_feed_version(f'follows:{instance.user_id}')
+
+
+@receiver(bulk_created, sender=Follow)
+def follows_bulk_created(sender, instances, **kwargs):
+    changes.record(Change.CREATED, *instances)
+    _follows_changed(instances, 1)
+    for user_id, author_ids in _authors_by_user(instances).items():
+        # up to a query per author, off the request
+        feed.schedule_backfill(user_id, *author_ids)
+
+
+@receiver(bulk_deleted, sender=Follow)
+def follows_bulk_deleted(sender, instances, **kwargs):
+    changes.record(Change.DELETED, *instances)
+    _follows_changed(instances, -1)
+    for user_id, author_ids in _authors_by_user(instances).items():
+        feed.remove_author(user_id, *author_ids)
+
+
+def _authors_by_user(follows):
+    authors = {}
+    for follow in follows:
+        authors.setdefault(follow.user_id, []).append(follow.author_id)
+    return authors
+
+
+def _follows_changed(follows, delta):
+    """Update counters and caches of follows created or deleted at once"""
+    stats.bump_many([follow.author_id for follow in follows],
+                    'followers_count', delta)
+    stats.bump_many([follow.user_id for follow in follows],
+                    'following_count', delta)
+    bump_feed_version(*{f'follows:{follow.user_id}' for follow in follows})
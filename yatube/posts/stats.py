@@ -0,0 +1,81 @@
+"""
+Denormalized author statistics.
+
+Counters are bumped by signal handlers on every create/delete, so pages
+read them from one row instead of running COUNT over posts and follows.
+rebuild() recounts them from scratch, see rebuild_author_stats command.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+
+from posts.models import AuthorStats, Comment, Follow, Post, User
+
+# counter name: (model, user field of the model)
+COUNTERS = {
+    'posts_count': (Post, 'author'),
+    'comments_count': (Comment, 'author'),
+    'followers_count': (Follow, 'author'),
+    'following_count': (Follow, 'user'),
+}
+
+
+def bump(user_id, counter, delta):
+    """Change one counter of the user by delta"""
+    updated = AuthorStats.objects.filter(user_id=user_id).update(
+        **{counter: F(counter) + delta}
+    )
+    # a missing row is recounted, unless the user is being deleted
+    if not updated and delta > 0:
+        rebuild([user_id])
+
+
+def bump_many(user_ids, counter, delta):
+    """
+    Change one counter by delta for every occurrence of a user, with a
+    query per distinct number of occurrences
+    """
+    by_total = {}
+    for user_id, total in Counter(user_ids).items():
+        by_total.setdefault(total, set()).add(user_id)
+    for total, ids in by_total.items():
+        _bump_all(ids, counter, delta * total)
+
+
+def _bump_all(user_ids, counter, delta):
+    updated = AuthorStats.objects.filter(user_id__in=user_ids).update(
+        **{counter: F(counter) + delta}
+    )
+    if updated < len(user_ids) and delta > 0:
+        rebuild(user_ids - set(AuthorStats.objects.filter(
+            user_id__in=user_ids
+        ).values_list('user_id', flat=True)))
+
+
+def rebuild(user_ids):
+    """Recount stats of the given users"""
+    stats = {
+        pk: AuthorStats(user_id=pk)
+        for pk in User.objects.filter(
+            pk__in=user_ids
+        ).values_list('pk', flat=True)
+    }
+    for counter, (model, field) in COUNTERS.items():
+        rows = model.objects.filter(
+            **{f'{field}__in': list(stats)}
+        ).values_list(field).annotate(total=Count('pk')).order_by()
+        for user_id, total in rows:
+            setattr(stats[user_id], counter, total)
+    with transaction.atomic():
+        AuthorStats.objects.filter(user_id__in=list(stats)).delete()
+        AuthorStats.objects.bulk_create(stats.values())
+    return stats
+
+
+def get_stats(user):
+    """Return stats of the user, counting them if there are none yet"""
+    try:
+        return user.stats
+    except AuthorStats.DoesNotExist:
+        return rebuild([user.pk])[user.pk]
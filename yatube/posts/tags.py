@@ -0,0 +1,117 @@
+"""
+Hashtags and mentions of posts and comments.
+
+Signal handlers parse "#tag" and "@username" out of every saved text into
+PostTag and Mention rows carrying the publication date, so a tag page or
+the mentions of a user are one indexed range instead of a LIKE scan over
+post texts. Rows of a text are replaced when it is edited and go away
+with it by cascade.
+"""
+import re
+from itertools import islice
+
+from django.db import transaction
+
+from posts.models import Comment, Mention, Post, PostTag, Tag, User
+from posts.search import normalize
+
+TAG = re.compile(r'(?<![\w#&])#(\w+)')
+# usernames may have ".@+-" inside, at the ends they are punctuation
+MENTION = re.compile(r'(?<![\w@])@(\w(?:[\w.@+-]*\w)?)')
+MAX_TAG_LENGTH = Tag._meta.get_field('name').max_length
+# number of texts indexed at once by backfill
+BATCH_SIZE = 500
+# fields read by backfill
+TEXT_FIELDS = {
+    Post: ('text', 'pub_date'),
+    Comment: ('post', 'text', 'created'),
+}
+
+
+def extract_tags(text):
+    """Tag names of the text, case and "ё" folded"""
+    return {normalize(name) for name in TAG.findall(text)
+            if len(name) <= MAX_TAG_LENGTH}
+
+
+def extract_mentions(text):
+    """Usernames mentioned in the text"""
+    return set(MENTION.findall(text))
+
+
+def _source(instance):
+    """Return (post_id, comment_id, date) of a post or a comment"""
+    if isinstance(instance, Comment):
+        return instance.post_id, instance.pk, instance.created
+    return instance.pk, None, instance.pub_date
+
+
+def _tag_ids(names):
+    """Ids of tags by name, creating the missing ones"""
+    if not names:
+        return {}
+    ids = dict(Tag.objects.filter(name__in=names).values_list('name', 'pk'))
+    missing = names - ids.keys()
+    if missing:
+        Tag.objects.bulk_create((Tag(name=name) for name in missing),
+                                ignore_conflicts=True)
+        ids.update(Tag.objects.filter(name__in=missing).values_list(
+            'name', 'pk'
+        ))
+    return ids
+
+
+def _clear(instances):
+    post_ids = [obj.pk for obj in instances if isinstance(obj, Post)]
+    comment_ids = [obj.pk for obj in instances if isinstance(obj, Comment)]
+    for model in (PostTag, Mention):
+        if post_ids:
+            model.objects.filter(post_id__in=post_ids,
+                                 comment__isnull=True).delete()
+        if comment_ids:
+            model.objects.filter(comment_id__in=comment_ids).delete()
+
+
+def index(instances, replace=True):
+    """Store tags and mentions of the posts or comments"""
+    instances = list(instances)
+    if replace:
+        _clear(instances)
+    tags, mentions = [], []
+    for instance in instances:
+        source = _source(instance)
+        tags += [(source, name) for name in extract_tags(instance.text)]
+        mentions += [(source, name)
+                     for name in extract_mentions(instance.text)]
+
+    tag_ids = _tag_ids({name for _, name in tags})
+    user_ids = dict(User.objects.filter(
+        username__in={name for _, name in mentions}
+    ).values_list('username', 'pk')) if mentions else {}
+    PostTag.objects.bulk_create(
+        PostTag(tag_id=tag_ids[name], post_id=post_id,
+                comment_id=comment_id, pub_date=date)
+        for (post_id, comment_id, date), name in tags
+    )
+    Mention.objects.bulk_create(
+        Mention(user_id=user_ids[name], post_id=post_id,
+                comment_id=comment_id, pub_date=date)
+        for (post_id, comment_id, date), name in mentions
+        if name in user_ids
+    )
+
+
+def backfill(model, chunk_size=BATCH_SIZE):
+    """Reindex all posts or comments chunk by chunk, return their number"""
+    texts = model.objects.order_by().only(
+        *TEXT_FIELDS[model]
+    ).iterator(chunk_size=chunk_size)
+    total = 0
+    while True:
+        chunk = list(islice(texts, chunk_size))
+        if not chunk:
+            break
+        with transaction.atomic():
+            index(chunk)
+        total += len(chunk)
+    return total
@@ -0,0 +1,18 @@
+from django import template
+
+from posts import thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_thumbnail(post, alias):
+    """URL of a pre-rendered thumbnail of the post image"""
+    return thumbnails.thumbnail_url(post, alias)
+
+
+@register.simple_tag
+def prefetch_thumbnails(posts):
+    """Look up thumbnails of all posts of a page at once"""
+    thumbnails.prefetch_thumbnails(posts)
+    return ''
@@ -0,0 +1,85 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from .. import paginator
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+CHANGELISTS = ('/admin/posts/post/', '/admin/posts/comment/',
+               '/admin/posts/follow/')
+
+
+class AdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin',
+                                                   email='admin@yatube.ru',
+                                                   password='password')
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.users = 0
+
+    def create_rows(self, number):
+        for _ in range(number):
+            self.users += 1
+            author = User.objects.create_user(username=f'author_{self.users}')
+            group = Group.objects.create(title=f'Группа {self.users}',
+                                         slug=f'group-{self.users}')
+            post = Post.objects.create(author=author, group=group,
+                                       text=f'Пост {self.users}')
+            Comment.objects.create(post=post, author=author, text='Текст')
+            Follow.objects.create(user=self.admin, author=author)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow(self):
+        self.create_rows(2)
+        before = {url: self.changelist_queries(url) for url in CHANGELISTS}
+        self.create_rows(4)
+        for url in CHANGELISTS:
+            with self.subTest(url=url):
+                self.assertEqual(self.changelist_queries(url), before[url])
+
+    def test_widgets_do_not_list_related_rows(self):
+        self.create_rows(3)
+        post = Post.objects.first()
+        urls = (f'/admin/posts/post/{post.pk}/change/', '/admin/posts/post/',
+                f'/admin/posts/comment/{post.comments.get().pk}/change/',
+                '/admin/posts/follow/add/')
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertNotContains(response, 'author_2</option>')
+                self.assertNotContains(response, 'Группа 2</option>')
+
+    def test_changelist_group_is_completed(self):
+        self.create_rows(2)
+        response = self.client.get('/admin/posts/post/')
+        self.assertContains(response, 'data-kind="groups"', count=2)
+        for slug in ('group-1', 'group-2'):
+            self.assertContains(response, f'value="{slug}"')
+
+    def test_approximate_count(self):
+        self.create_rows(3)
+        whole = paginator.ApproximateCountPaginator(Post.objects.all(), 2)
+        self.assertEqual(whole.count, 3)
+        limit = paginator.EXACT_COUNT_LIMIT
+        paginator.EXACT_COUNT_LIMIT = 1
+        try:
+            Post.objects.order_by('pk').first().delete()
+            whole = paginator.ApproximateCountPaginator(Post.objects.all(), 2)
+            filtered = paginator.ApproximateCountPaginator(
+                Post.objects.filter(text__startswith='Пост'), 1
+            )
+            # no statistics: estimated from the largest id
+            self.assertEqual(whole.count, 3)
+            # filtered lists are counted up to the limit
+            self.assertEqual(filtered.count, 1)
+        finally:
+            paginator.EXACT_COUNT_LIMIT = limit
@@ -0,0 +1,126 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from .. import autocomplete
+from ..autocomplete import USER_FIELDS, groups, users
+from ..forms import PostForm
+from ..models import Group, Post
+
+User = get_user_model()
+
+URL = '/api/v1/autocomplete/'
+
+
+# reloads of the indexes run inline
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.anna = User.objects.create_user(username='anna',
+                                             first_name='Анна')
+        self.andrew = User.objects.create_user(username='Andrew',
+                                               last_name='Анисимов')
+        self.group = Group.objects.create(title='Ёлки', slug='trees',
+                                          description='Описание')
+
+    def names(self, prefix):
+        return [item['username'] for item in users.search(prefix, 10)]
+
+    def test_prefix_lookup(self):
+        self.assertEqual(self.names('an'), ['Andrew', 'anna'])
+        self.assertEqual(self.names('AN'), ['Andrew', 'anna'])
+        self.assertEqual(self.names('анн'), ['anna'])
+        self.assertEqual(self.names('ann'), ['anna'])
+        self.assertEqual(self.names('b'), [])
+        self.assertEqual(self.names(' '), [])
+        self.assertEqual(users.search('a', 1), [
+            {'id': self.andrew.pk, 'username': 'Andrew', 'first_name': '',
+             'last_name': 'Анисимов'}
+        ])
+        self.assertEqual(groups.search('ел', 10)[0]['slug'], 'trees')
+
+    def test_lookup_does_not_query_database(self):
+        users.search('a', 10)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names('ann'), ['anna'])
+
+    def test_index_follows_writes_without_reload(self):
+        users.search('a', 10)
+        groups.search('t', 10)
+        User.objects.create_user(username='bob')
+        self.anna.username = 'maria'
+        self.anna.save()
+        self.andrew.delete()
+        self.group.delete()
+        # replayed from the log, the index is not reloaded
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names('an'), [])
+            self.assertEqual(self.names('ма'), [])
+            self.assertEqual(self.names('m'), ['maria'])
+            self.assertEqual(self.names('bo'), ['bob'])
+            self.assertEqual(groups.search('t', 10), [])
+
+    def test_saves_not_changing_names_keep_version(self):
+        users.search('a', 10)
+        version = cache.get(users.version_key)
+        update_last_login(None, self.anna)
+        self.anna.set_password('password')
+        self.anna.save()
+        inactive = User.objects.create_user(username='inactive',
+                                            is_active=False)
+        inactive.save()
+        self.assertEqual(cache.get(users.version_key), version)
+        self.anna.first_name = 'Аня'
+        self.anna.save(update_fields=['first_name'])
+        self.assertNotEqual(cache.get(users.version_key), version)
+        self.assertEqual(self.names('аня'), ['anna'])
+
+    def test_other_process_change_is_replayed(self):
+        self.assertEqual(self.names('ann'), ['anna'])
+        # a write in another process logged the change
+        self.anna.username = 'annette'
+        entry = users._entry([getattr(self.anna, f) for f in USER_FIELDS])
+        users._log(self.anna.pk, entry)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names('ann'), ['annette'])
+
+    def test_gap_in_log_reloads_in_background(self):
+        self.assertEqual(self.names('ann'), ['anna'])
+        # a change in another process whose log entry was lost
+        cache.incr(users.version_key)
+        User.objects.filter(pk=self.anna.pk).update(username='annette')
+        with mock.patch.object(autocomplete, 'run_in_background') as run, \
+                self.assertNumQueries(0):
+            self.assertEqual(self.names('ann'), ['anna'])
+            self.assertEqual(self.names('ann'), ['anna'])
+        run.assert_called_once_with(users._load)
+        users._load()
+        self.assertEqual(self.names('ann'), ['annette'])
+
+    def test_endpoint(self):
+        response = Client().get(URL, {'q': 'tr'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'users': [], 'groups': [
+            {'id': self.group.pk, 'slug': 'trees', 'title': 'Ёлки'}
+        ]})
+        response = Client().get(URL, {'q': 'a', 'kind': 'users'})
+        self.assertEqual(len(response.json()['users']), 2)
+        response = Client().get(URL, {'q': 'a', 'kind': 'posts'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_post_form_widget(self):
+        post = Post.objects.create(author=self.anna, group=self.group,
+                                   text='Текст')
+        groups.search('t', 10)
+        with self.assertNumQueries(0):
+            html = str(PostForm(instance=post)['group'])
+        self.assertIn(f'name="group" value="{self.group.pk}"', html)
+        self.assertIn('value="trees"', html)
+        self.assertNotIn('<option', html)
+        form = PostForm({'text': 'Текст', 'group': self.group.pk})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['group'], self.group)
@@ -0,0 +1,88 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='test_user')
+        self.reader = User.objects.create_user(username='reader')
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.group = Group.objects.create(title='Группа', slug='group',
+                                          description='Описание')
+        self.post = Post.objects.create(author=self.user, group=self.group,
+                                        text='Тестовый пост')
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user,)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+            '/api/v1/posts/',
+            '/api/v1/groups/',
+            f'/api/v1/posts/{self.post.pk}/comments/',
+        )
+
+    def revalidate(self, client, url, etag):
+        return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_are_not_modified(self):
+        for client in (Client(), self.reader_client):
+            for url in self.urls:
+                with self.subTest(url=url):
+                    etag = client.get(url)['ETag']
+                    response = self.revalidate(client, url, etag)
+                    self.assertEqual(response.status_code, 304)
+                    self.assertEqual(response.content, b'')
+
+    def test_changes_modify_pages(self):
+        etags = {url: self.reader_client.get(url)['ETag']
+                 for url in self.urls}
+        Comment.objects.create(post=self.post, author=self.reader,
+                               text='Комментарий')
+        changed = {reverse('posts:post_detail', args=(self.post.pk,)),
+                   f'/api/v1/posts/{self.post.pk}/comments/'}
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.revalidate(self.reader_client, url, etag)
+                self.assertEqual(response.status_code,
+                                 200 if url in changed else 304)
+        self.post.text = 'Новый текст'
+        self.post.save()
+        self.group.title = 'Новое название'
+        self.group.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.revalidate(self.reader_client, url, etag)
+                self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_visitor(self):
+        url = reverse('posts:profile', args=(self.user,))
+        etag = self.reader_client.get(url)['ETag']
+        self.assertNotEqual(Client().get(url)['ETag'], etag)
+        Follow.objects.create(user=self.reader, author=self.user)
+        response = self.revalidate(self.reader_client, url, etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Отписаться')
+
+    def test_etag_changes_on_login(self):
+        # the page carries the csrf token, which a new login rotates
+        self.reader.set_password('password')
+        self.reader.save()
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        etags = []
+        for _ in range(2):
+            self.reader_client.post(reverse('users:login'), {
+                'username': 'reader', 'password': 'password'
+            })
+            response = self.reader_client.get(url)
+            self.assertEqual(response.context['user'], self.reader)
+            etags.append(response['ETag'])
+            self.reader_client.logout()
+        self.assertNotEqual(*etags)
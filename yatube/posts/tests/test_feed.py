@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import feed
+from ..models import FeedEntry, Follow, Post
+
+User = get_user_model()
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class FeedTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='author')
+        self.old_post = Post.objects.create(author=self.author,
+                                            text='Старый пост')
+
+    def feed_posts(self):
+        return list(FeedEntry.objects.filter(
+            user=self.user
+        ).values_list('post_id', flat=True))
+
+    def test_follow_backfills_feed(self):
+        """Posts published before follow appear in feed"""
+        Follow.objects.create(user=self.user, author=self.author)
+        self.assertEqual(self.feed_posts(), [self.old_post.pk])
+
+    def test_follow_backfills_newest_posts_only(self):
+        new_post = Post.objects.create(author=self.author, text='Новый пост')
+        with mock.patch.object(feed, 'FEED_BACKFILL_POSTS', 1):
+            Follow.objects.create(user=self.user, author=self.author)
+        self.assertEqual(self.feed_posts(), [new_post.pk])
+
+    def test_new_post_fans_out(self):
+        """New post is pushed to followers only"""
+        Follow.objects.create(user=self.user, author=self.author)
+        stranger = User.objects.create_user(username='stranger')
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(self.feed_posts(), [post.pk, self.old_post.pk])
+        self.assertFalse(FeedEntry.objects.filter(user=stranger).exists())
+        entry = FeedEntry.objects.get(user=self.user, post=post)
+        self.assertEqual(entry.pub_date, post.pub_date)
+
+    def test_unfollow_and_delete_clean_feed(self):
+        """Unfollow and post deletion remove feed entries"""
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        self.old_post.delete()
+        self.assertEqual(self.feed_posts(), [])
+        Post.objects.create(author=self.author, text='Новый пост')
+        follow.delete()
+        self.assertEqual(self.feed_posts(), [])
+
+    def test_follow_page_shows_follows_at_once(self):
+        """Cached follow page changes on follow and unfollow"""
+        cache.clear()
+        client = Client()
+        client.force_login(self.user)
+        url = reverse('posts:follow_index')
+        self.assertNotContains(client.get(url), 'Старый пост')
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        self.assertContains(client.get(url), 'Старый пост')
+        follow.delete()
+        self.assertNotContains(client.get(url), 'Старый пост')
@@ -15,7 +15,8 @@ User = get_user_model()
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT,
+                   BACKGROUND_TASKS_EAGER=True)
 class PostFormTests(TestCase):
     @classmethod
     def tearDownClass(cls):
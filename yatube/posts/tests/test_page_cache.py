@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.user = User.objects.create_user(username='test_user')
+        self.group = Group.objects.create(title='Группа', slug='group',
+                                          description='Описание')
+        self.post = Post.objects.create(author=self.user, group=self.group,
+                                        text='Тестовый пост')
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user,)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        )
+
+    def test_anonymous_pages_are_cached(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                self.assertNotIn('X-Page-Cache', first)
+                with self.assertNumQueries(0):
+                    second = self.guest_client.get(url)
+                self.assertEqual(second['X-Page-Cache'], 'hit')
+                self.assertEqual(first.content, second.content)
+
+    def test_hits_keep_response_headers(self):
+        headers = ('Content-Type', 'Content-Length', 'X-Frame-Options',
+                   'X-Content-Type-Options', 'ETag')
+        for url in self.urls:
+            with self.subTest(url=url):
+                first = self.guest_client.get(url)
+                second = self.guest_client.get(url)
+                self.assertEqual(second['X-Page-Cache'], 'hit')
+                for header in headers:
+                    self.assertEqual(second.get(header), first.get(header),
+                                     header)
+                self.assertEqual(second['X-Frame-Options'], 'SAMEORIGIN')
+
+    def test_logged_in_and_cookies_bypass_cache(self):
+        self.guest_client.get(self.urls[0])
+        authorized_client = Client()
+        authorized_client.force_login(self.user)
+        response = authorized_client.get(self.urls[0])
+        self.assertNotIn('X-Page-Cache', response)
+        self.guest_client.cookies['some'] = 'cookie'
+        response = self.guest_client.get(self.urls[0])
+        self.assertNotIn('X-Page-Cache', response)
+
+    def test_writes_purge_affected_pages(self):
+        for url in self.urls:
+            self.guest_client.get(url)
+        other = User.objects.create_user(username='other')
+        Comment.objects.create(post=self.post, author=other,
+                               text='Новый комментарий')
+        # comment is shown only on the post page
+        response = self.guest_client.get(self.urls[3])
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertContains(response, other.username)
+        for url in self.urls[:3]:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response['X-Page-Cache'], 'hit')
+
+        self.post.text = 'Исправленный пост'
+        self.post.save()
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, 'Исправленный пост')
@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from ..models import Post
+from ..paginator import CursorPaginator
+
+User = get_user_model()
+
+PER_PAGE = 3
+POSTS_NUM = 8
+
+
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user')
+        for i in range(POSTS_NUM):
+            Post.objects.create(author=self.user, text=f'Тестовый пост {i}')
+        # newest first, ties on pub_date are broken by pk
+        self.posts = list(Post.objects.order_by('-pub_date', '-pk'))
+
+    def get_page(self, cursor=None):
+        paginator = CursorPaginator(Post.objects.all(), PER_PAGE)
+        return paginator.get_page(cursor)
+
+    def test_walk_forward_and_back(self):
+        """Next and previous cursors visit every post exactly once"""
+        page = self.get_page()
+        self.assertFalse(page.has_previous())
+        seen = list(page)
+        while page.has_next():
+            page = self.get_page(page.paginator.next_cursor)
+            seen.extend(page)
+        self.assertEqual(seen, self.posts)
+
+        page = self.get_page(page.paginator.previous_cursor)
+        self.assertEqual(list(page), self.posts[PER_PAGE:2 * PER_PAGE])
+        self.assertTrue(page.has_next())
+        self.assertTrue(page.has_previous())
+
+    def test_last_page(self):
+        """Last cursor reads the tail of the list"""
+        paginator = CursorPaginator(Post.objects.all(), PER_PAGE)
+        page = self.get_page(paginator.last_cursor)
+        self.assertEqual(list(page), self.posts[-PER_PAGE:])
+        self.assertFalse(page.has_next())
+        self.assertTrue(page.has_previous())
+
+    def test_invalid_cursor_gives_first_page(self):
+        page = self.get_page('not a cursor')
+        self.assertEqual(list(page), self.posts[:PER_PAGE])
+
+    def test_page_does_not_count(self):
+        """Page is served by a single query without COUNT"""
+        with self.assertNumQueries(1):
+            page = self.get_page()
+            page.has_other_pages()
@@ -0,0 +1,100 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..models import Comment, Follow, Group, Post
+from yatube.settings import POSTS_PER_PAGE
+
+User = get_user_model()
+
+
+class QueryBudgetTests(TestCase):
+    """Number of queries of a page does not depend on number of rows"""
+
+    def setUp(self):
+        self.reader = User.objects.create_user(username='reader')
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.api_client = APIClient()
+        self.group = Group.objects.create(title='Группа', slug='group',
+                                          description='Описание')
+        self.post = self.add_post()
+
+    def add_post(self):
+        number = Post.objects.count()
+        author = User.objects.create_user(username=f'author_{number}')
+        Follow.objects.create(user=self.reader, author=author)
+        return Post.objects.create(author=author, group=self.group,
+                                   text=f'Пост {number}')
+
+    def add_comment(self):
+        number = Comment.objects.count()
+        author = User.objects.create_user(username=f'commenter_{number}')
+        return Comment.objects.create(post=self.post, author=author,
+                                      text=f'Комментарий {number}')
+
+    def count_queries(self, client, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def assert_constant_queries(self, client, url, add_row):
+        few = self.count_queries(client, url)
+        for _ in range(POSTS_PER_PAGE):
+            add_row()
+        self.assertEqual(self.count_queries(client, url), few, url)
+
+    def test_post_lists(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:follow_index'),
+            '/api/v1/posts/',
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assert_constant_queries(
+                    self.api_client if url.startswith('/api/')
+                    else self.client,
+                    url, self.add_post
+                )
+
+    def test_profile(self):
+        def add_own_post():
+            Post.objects.create(author=self.post.author, group=self.group,
+                                text='Ещё пост')
+        self.assert_constant_queries(
+            self.client,
+            reverse('posts:profile', args=(self.post.author,)),
+            add_own_post
+        )
+
+    def test_comment_lists(self):
+        urls = (
+            reverse('posts:post_detail', args=(self.post.pk,)),
+            f'/api/v1/posts/{self.post.pk}/comments/',
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assert_constant_queries(
+                    self.api_client if url.startswith('/api/')
+                    else self.client,
+                    url, self.add_comment
+                )
+
+
+class QueryPlanTests(TestCase):
+    def test_list_queries_use_indexes(self):
+        """No list query scans a whole table or sorts in memory"""
+        out = StringIO()
+        call_command('explain_list_queries', check=True, stdout=out)
+        self.assertIn('post_author_pub_date_idx', out.getvalue())
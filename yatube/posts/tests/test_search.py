@@ -0,0 +1,79 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from ..bulk import bulk_insert
+from ..models import Comment, Post
+from ..search import matching, ranked, terms
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user')
+        self.tree = Post.objects.create(
+            author=self.user, text='Зелёные ёлки в зимнем лесу'
+        )
+        self.cats = Post.objects.create(
+            author=self.user, text='Про котов и собак'
+        )
+        self.more_cats = Post.objects.create(
+            author=self.user, text='Кот, кот и ещё раз коты'
+        )
+        self.comment = Comment.objects.create(
+            post=self.tree, author=self.user, text='Люблю кошек и котиков'
+        )
+
+    def search(self, query, queryset=None):
+        return list(ranked(queryset or Post.objects.all(), query))
+
+    def test_russian_words_are_matched(self):
+        self.assertEqual(terms('Ёлками КОТАМИ'), ['елк', 'кот'])
+        self.assertEqual(self.search('елка'), [self.tree])
+        self.assertEqual(self.search('ЗЕЛЕНАЯ ёлка'), [self.tree])
+        self.assertEqual(self.search('лес собака'), [])
+        self.assertEqual(self.search('%_" OR *'), [])
+        self.assertEqual(self.search(''), [])
+
+    def test_results_are_ranked(self):
+        self.assertEqual(self.search('коты'), [self.more_cats, self.cats])
+        self.assertEqual(self.search('котик', Comment.objects.all()),
+                         [self.comment])
+
+    def test_index_follows_writes(self):
+        self.tree.text = 'Сосны'
+        self.tree.save()
+        self.assertEqual(self.search('ёлки'), [])
+        self.assertEqual(self.search('сосна'), [self.tree])
+        self.cats.delete()
+        self.assertEqual(self.search('кот'), [self.more_cats])
+        post, = bulk_insert(Post, [Post(author=self.user, text='Котята')])
+        self.assertIn(post, self.search('котята'))
+
+    def test_search_page(self):
+        response = Client().get(reverse('posts:search'), {'q': 'котов'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['posts']),
+                         [self.more_cats, self.cats])
+        self.assertEqual(list(response.context['comments']),
+                         [self.comment])
+
+    def test_api_search(self):
+        response = APIClient().get('/api/v1/posts/', {'search': 'кот'})
+        self.assertEqual([item['id'] for item in response.data['results']],
+                         [self.more_cats.pk, self.cats.pk])
+
+    def test_admin_search(self):
+        admin = User.objects.create_superuser(username='admin',
+                                              email='admin@yatube.ru',
+                                              password='password')
+        client = Client()
+        client.force_login(admin)
+        response = client.get('/admin/posts/post/', {'q': 'ёлка'})
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [self.tree])
+        self.assertEqual(
+            list(matching(Comment.objects.all(), 'котики')), [self.comment]
+        )
@@ -0,0 +1,87 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..bulk import bulk_insert
+from ..models import Comment, Mention, Post, PostTag
+from ..tags import extract_mentions, extract_tags
+
+User = get_user_model()
+
+
+class TagsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user')
+        self.friend = User.objects.create_user(username='friend.1')
+        self.client = Client()
+        self.client.force_login(self.friend)
+        self.post = Post.objects.create(
+            author=self.user, text='Ёлки #Зима #лес, привет @friend.1!'
+        )
+
+    def tagged(self, name):
+        response = self.client.get(reverse('posts:tag_posts', args=[name]))
+        return [(entry.post, entry.comment)
+                for entry in response.context['page_obj']]
+
+    def mentioned(self):
+        response = self.client.get(reverse('posts:mentions'))
+        return [(entry.post, entry.comment)
+                for entry in response.context['page_obj']]
+
+    def test_extract(self):
+        self.assertEqual(extract_tags('#Ёж,#ёж #a#b x#c &#39; #'),
+                         {'еж', 'a'})
+        self.assertEqual(extract_mentions('@a.b. @c-d- mail@x.ru @@e'),
+                         {'a.b', 'c-d'})
+
+    def test_tag_page(self):
+        comment = Comment.objects.create(post=self.post, author=self.friend,
+                                         text='И #лес тоже')
+        self.assertEqual(self.tagged('Лес'),
+                         [(self.post, comment), (self.post, None)])
+        self.assertEqual(self.tagged('зима'), [(self.post, None)])
+        response = self.client.get(reverse('posts:tag_posts',
+                                           args=['лето']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_mentions_page(self):
+        comment = Comment.objects.create(post=self.post, author=self.user,
+                                         text='@friend.1 @nobody')
+        self.assertEqual(self.mentioned(),
+                         [(self.post, comment), (self.post, None)])
+        self.assertEqual(Mention.objects.count(), 2)
+
+    def test_rows_follow_writes(self):
+        self.post.text = '#лето'
+        self.post.save()
+        self.assertEqual(self.tagged('лето'), [(self.post, None)])
+        self.assertEqual(self.mentioned(), [])
+        comment = Comment.objects.create(post=self.post, author=self.user,
+                                         text='#лето')
+        comment.delete()
+        self.assertEqual(self.tagged('лето'), [(self.post, None)])
+        posts = bulk_insert(Post, [Post(author=self.user, text='#лето')])
+        self.assertEqual(self.tagged('лето'),
+                         [(posts[0], None), (self.post, None)])
+        self.post.delete()
+        self.assertEqual(self.tagged('лето'), [(posts[0], None)])
+
+    def test_unchanged_text_is_not_reindexed(self):
+        PostTag.objects.all().delete()
+        self.post.save()
+        self.assertEqual(PostTag.objects.count(), 0)
+
+    def test_backfill(self):
+        PostTag.objects.all().delete()
+        Mention.objects.all().delete()
+        Comment.objects.create(post=self.post, author=self.user,
+                               text='#лес')
+        out = StringIO()
+        call_command('index_tags', '--chunk-size', '1', stdout=out)
+        self.assertIn('Indexed 1', out.getvalue())
+        self.assertEqual(PostTag.objects.count(), 3)
+        self.assertEqual(Mention.objects.count(), 1)
@@ -0,0 +1,72 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post
+from ..thumbnails import prefetch_thumbnails, thumbnail_url
+from .constants import TEST_IMAGE
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, BACKGROUND_TASKS_EAGER=True)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        caches[settings.THUMBNAIL_CACHE].clear()
+        self.user = User.objects.create_user(username='test_user')
+        self.guest_client = Client()
+
+    def create_post(self):
+        return Post.objects.create(
+            author=self.user,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(name='test_image.gif',
+                                     content=TEST_IMAGE,
+                                     content_type='image/gif'),
+        )
+
+    def test_thumbnails_are_rendered_on_save(self):
+        # marked ready by the image check run inline
+        post = Post.objects.get(pk=self.create_post().pk)
+        url = thumbnail_url(post, 'card')
+        self.assertIsNotNone(url)
+        self.assertTrue(url.startswith(settings.MEDIA_URL + 'cache/'))
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertContains(response, url)
+
+    @override_settings(BACKGROUND_TASKS_EAGER=False)
+    def test_page_does_not_render_missing_thumbnail(self):
+        post = self.create_post()
+        self.assertIsNone(thumbnail_url(post, 'card'))
+        response = self.guest_client.get(
+            reverse('posts:post_detail', args=(post.pk,))
+        )
+        self.assertNotContains(response, '<img class="card-img')
+
+    def test_page_thumbnails_are_looked_up_at_once(self):
+        posts = [self.create_post() for _ in range(3)]
+        posts = list(Post.objects.filter(pk__in=[p.pk for p in posts]))
+        thumbnail_cache = caches[settings.THUMBNAIL_CACHE]
+        with mock.patch.object(thumbnail_cache, 'get_many',
+                               wraps=thumbnail_cache.get_many) as get_many:
+            prefetch_thumbnails(posts)
+        self.assertEqual(get_many.call_count, 1)
+        with mock.patch.object(thumbnail_cache, 'get') as get:
+            urls = [thumbnail_url(post, 'card') for post in posts]
+        get.assert_not_called()
+        self.assertNotIn(None, urls)
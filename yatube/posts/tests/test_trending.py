@@ -0,0 +1,93 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import trending
+from ..bulk import bulk_insert
+from ..models import Comment, Post, TrendingScore
+
+User = get_user_model()
+
+
+class TrendingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='test_user')
+        self.old, self.new, self.quiet = (
+            Post.objects.create(author=self.user, text=f'Пост {number}')
+            for number in range(3)
+        )
+
+    def comment(self, post):
+        return Comment.objects.create(post=post, author=self.user,
+                                      text='Текст')
+
+    def ranking(self):
+        return [post_id for post_id, _ in trending.top()]
+
+    def test_recent_comments_weigh_more(self):
+        now = timezone.now()
+        half_life = timedelta(seconds=trending.TRENDING_HALF_LIFE)
+        self.assertAlmostEqual(
+            trending.log_weight(now) - trending.log_weight(now - half_life),
+            trending.math.log(2)
+        )
+        comments = [Comment(post=self.old, created=now - 2 * half_life)] * 3
+        trending.record(comments)
+        trending.record([Comment(post=self.new, created=now)])
+        # 3 comments two half-lives ago weigh 3/4 of one comment now
+        self.assertEqual(self.ranking(), [self.new.pk, self.old.pk])
+        trending.record([Comment(post=self.old, created=now)])
+        self.assertEqual(self.ranking(), [self.old.pk, self.new.pk])
+
+    def test_scores_are_updated_on_comment(self):
+        self.comment(self.old)
+        self.comment(self.new)
+        self.comment(self.new)
+        self.assertEqual(self.ranking(), [self.new.pk, self.old.pk])
+        bulk_insert(Comment, [
+            Comment(post=self.old, author=self.user, text='Текст')
+            for _ in range(2)
+        ])
+        self.assertEqual(self.ranking(), [self.old.pk, self.new.pk])
+        self.assertEqual(TrendingScore.objects.count(), 2)
+
+    def test_row_created_concurrently_is_added_to(self):
+        now = timezone.now()
+        # as if another transaction created the row of the first comment
+        TrendingScore.objects.create(post=self.old,
+                                     score=trending.log_weight(now))
+        trending.record([Comment(post=self.old, created=now)])
+        self.assertAlmostEqual(
+            TrendingScore.objects.get(post=self.old).score,
+            trending.log_weight(now) + trending.math.log(2)
+        )
+
+    def test_top_is_kept_in_cache(self):
+        self.comment(self.old)
+        self.ranking()
+        self.comment(self.new)
+        self.comment(self.new)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.ranking(), [self.new.pk, self.old.pk])
+        with mock.patch.object(trending, 'TRENDING_SIZE', 1):
+            self.comment(self.quiet)
+            self.assertEqual(self.ranking(), [self.new.pk])
+
+    def test_trending_page(self):
+        self.comment(self.old)
+        self.comment(self.new)
+        self.comment(self.new)
+        self.new.delete()
+        client = Client()
+        client.get(reverse('posts:trending'))
+        # one query for the posts of the cached list
+        with self.assertNumQueries(1):
+            response = client.get(reverse('posts:trending'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['posts'], [self.old])
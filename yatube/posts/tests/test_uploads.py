@@ -0,0 +1,112 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from PIL import Image
+
+from .. import uploads
+from ..models import Post
+from ..thumbnails import thumbnail_url
+from .constants import CREATE_URL
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def png(size=(20, 10)):
+    file = io.BytesIO()
+    Image.new('RGB', size, (255, 0, 0)).save(file, 'PNG')
+    return file.getvalue()
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, BACKGROUND_TASKS_EAGER=True)
+class UploadTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='test_user')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create(self, content, name='image.png'):
+        return self.client.post(CREATE_URL, {
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile(name, content, 'image/png'),
+        })
+
+    def test_handler_stops_reading_at_the_limit(self):
+        request = mock.Mock(spec=[])
+        handler = uploads.SizeLimitedUploadHandler(request)
+        with mock.patch.object(uploads, 'UPLOAD_MAX_BYTES', 10):
+            handler.new_file('image', 'image.png', 'image/png', 24)
+            handler.receive_data_chunk(b'x' * 8, 0)
+            with self.assertRaises(uploads.StopUpload) as stop:
+                handler.receive_data_chunk(b'x' * 8, 8)
+        self.assertTrue(stop.exception.connection_reset)
+        self.assertEqual(uploads.stopped_uploads(request), ('image',))
+        handler.file.close()
+
+    def test_stopped_upload_is_reported(self):
+        with mock.patch.object(uploads, 'UPLOAD_MAX_BYTES', 10):
+            response = self.create(png())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(
+            response.context['form'].has_error('image', 'file_too_large')
+        )
+        self.assertFalse(Post.objects.exists())
+
+    def test_limits_are_checked_in_request(self):
+        content = png()
+        limits = (('UPLOAD_MAX_BYTES', len(content) - 1),
+                  ('UPLOAD_MAX_PIXELS', 199))
+        for limit, value in limits:
+            with self.subTest(limit=limit), \
+                    mock.patch.object(uploads, limit, value):
+                response = self.create(content)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response.context['form'].errors['image'])
+        response = self.create(b'not an image')
+        self.assertTrue(response.context['form'].errors['image'])
+        self.assertFalse(Post.objects.exists())
+        self.create(content)
+        self.assertTrue(Post.objects.get().image_ready)
+
+    def test_image_is_decoded_off_request(self):
+        content = bytearray(png())
+        # the header is intact, the pixel data is not
+        content[-20:-12] = b'\x00' * 8
+        with mock.patch.object(uploads, 'run_in_background') as run:
+            self.create(bytes(content))
+        post = Post.objects.get()
+        self.assertFalse(post.image_ready)
+        self.assertIsNone(thumbnail_url(post, 'card'))
+        run.assert_called_once_with(uploads.verify_image, post.pk,
+                                    post.image.name)
+        storage = post.image.storage
+        self.assertTrue(storage.exists(post.image.name))
+        with self.assertLogs('posts.uploads', 'WARNING'):
+            uploads.verify_image(post.pk, post.image.name)
+        post.refresh_from_db()
+        self.assertEqual(post.image.name, '')
+        self.assertTrue(post.image_ready)
+        self.assertFalse(storage.exists(run.call_args[0][2]))
+
+    def test_lost_verification_is_recovered(self):
+        with mock.patch.object(uploads, 'run_in_background'):
+            self.create(png())
+        post = Post.objects.get()
+        self.assertFalse(post.image_ready)
+        call_command('verify_images', stdout=io.StringIO())
+        post.refresh_from_db()
+        self.assertTrue(post.image_ready)
+        self.assertEqual(uploads.verify_pending(), 0)
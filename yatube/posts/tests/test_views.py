@@ -18,7 +18,8 @@ User = get_user_model()
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=BASE_DIR)
 
 
-@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT,
+                   BACKGROUND_TASKS_EAGER=True)
 class PostViewsTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -118,15 +119,19 @@ class PostViewsTests(TestCase):
         self.assertEqual(response.context['page_obj'][0].image.name,
                          self.group_posts[-1].image.name)
         # check second page contains 3 posts
+        cursor = response.context['page_obj'].paginator.next_cursor
         response = self.authorized_client.get(reverse('posts:index')
-                                              + '?page=2')
+                                              + f'?cursor={cursor}')
         self.assertEqual(len(response.context['page_obj']), 3)
 
     def test_index_page_cache(self):
         """Home template generated with cache."""
         response = self.authorized_client.get(reverse('posts:index'))
         first = response.content
-        Post.objects.latest('pk').delete()
+        # change bypassing signals is not seen until cache is cleared
+        Post.objects.filter(pk=Post.objects.latest('pk').pk).update(
+            text='Текст в обход сигналов'
+        )
         response = self.authorized_client.get(reverse('posts:index'))
         second = response.content
         self.assertEqual(first, second)
@@ -135,6 +140,32 @@ class PostViewsTests(TestCase):
         third = response.content
         self.assertNotEqual(second, third)
 
+    def test_feed_cache_invalidation(self):
+        """Post writes show up at once on cached feed pages"""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.user}),
+        )
+        for url in urls:
+            self.guest_client.get(url)
+        post = Post.objects.create(author=self.user, group=self.group,
+                                   text='Свежий пост')
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, 'Свежий пост')
+        # post moved to another group leaves the old group page
+        post.group = self.group2
+        post.save()
+        response = self.guest_client.get(urls[1])
+        self.assertNotContains(response, 'Свежий пост')
+        post.delete()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertNotContains(response, 'Свежий пост')
+
     def test_group_list_page_show_correct_context(self):
         """Group_list template generated with right context."""
         query = reverse('posts:group_list', kwargs={'slug': self.group.slug})
@@ -185,8 +216,8 @@ class PostViewsTests(TestCase):
         self.assertEqual(response.context['page_obj'][0].image.name,
                          self.group_posts[-1].image.name)
         # check second page contains 3 posts
-        response = self.authorized_client.get(reverse('posts:index')
-                                              + '?page=2')
+        cursor = response.context['page_obj'].paginator.next_cursor
+        response = self.authorized_client.get(query + f'?cursor={cursor}')
         self.assertEqual(len(response.context['page_obj']), 3)
 
     def test_post_detail_show_correct_context(self):
@@ -0,0 +1,82 @@
+"""
+Eager thumbnails of post images.
+
+Thumbnails of every configured alias are rendered in background right
+after a post image is verified (see posts.uploads); templates only look
+up the finished URLs, for a whole page at once with prefetch_thumbnails.
+"""
+import hashlib
+
+from django.core.cache import caches
+from sorl.thumbnail import get_thumbnail
+
+from core.tasks import run_in_background
+from posts.cache import bump_feed_version, post_scopes
+from posts.models import Post
+from yatube.settings import POST_THUMBNAILS, THUMBNAIL_CACHE
+
+URL_KEY_PREFIX = 'thumbnail-url:'
+JOB_KEY_PREFIX = 'thumbnail-job:'
+# a failed job may be scheduled again after this time
+JOB_TIMEOUT = 60
+
+# shared with sorl-thumbnail key-value store
+cache = caches[THUMBNAIL_CACHE]
+
+
+def _name_hash(name):
+    return hashlib.md5(name.encode()).hexdigest()
+
+
+def url_key(name, alias):
+    return f'{URL_KEY_PREFIX}{alias}:{_name_hash(name)}'
+
+
+def generate_thumbnails(post_id):
+    """Render thumbnails of all aliases for the post image"""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image or not post.image_ready:
+        return
+    for alias, (geometry, options) in POST_THUMBNAILS.items():
+        thumbnail = get_thumbnail(post.image.name, geometry, **options)
+        if thumbnail.exists():
+            cache.set(url_key(post.image.name, alias), thumbnail.url, None)
+    # pages cached before the thumbnails were ready have no image
+    bump_feed_version(*post_scopes(post))
+
+
+def schedule_thumbnails(post):
+    """Render thumbnails in background, one job at a time per image"""
+    if cache.add(JOB_KEY_PREFIX + _name_hash(post.image.name), True,
+                 JOB_TIMEOUT):
+        run_in_background(generate_thumbnails, post.pk)
+
+
+def prefetch_thumbnails(posts):
+    """Look up thumbnails of all posts with a single cache query"""
+    posts = [post for post in posts if post.image and post.image_ready]
+    keys = {
+        url_key(post.image.name, alias): (post, alias)
+        for post in posts for alias in POST_THUMBNAILS
+    }
+    urls = cache.get_many(list(keys))
+    for post in posts:
+        post._thumbnail_urls = {}
+    for key, (post, alias) in keys.items():
+        post._thumbnail_urls[alias] = urls.get(key)
+    for post in posts:
+        if None in post._thumbnail_urls.values():
+            schedule_thumbnails(post)
+
+
+def thumbnail_url(post, alias):
+    """Return URL of a finished thumbnail, None if it is not ready yet"""
+    if not post.image or not post.image_ready:
+        return None
+    prefetched = getattr(post, '_thumbnail_urls', {})
+    if alias in prefetched:
+        return prefetched[alias]
+    url = cache.get(url_key(post.image.name, alias))
+    if url is None:
+        schedule_thumbnails(post)
+    return url
@@ -0,0 +1,97 @@
+"""
+Trending posts ranked by decayed comment velocity.
+
+A comment created at time t weighs exp(DECAY * t), so it counts half as
+much as a comment written TRENDING_HALF_LIFE later. The score of a post
+is the sum of the weights of its comments, the decay keeps the order of
+scores the same at any moment and nothing has to be rescored as time
+passes. Scores are stored as logarithms, which keeps them in float range,
+and are added to by signal handlers when comments are created; deleted
+comments keep counting. The top TRENDING_SIZE posts are kept in the
+cache, so the trending page runs no aggregation.
+"""
+import heapq
+import math
+from datetime import datetime
+from operator import itemgetter
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from posts.models import TrendingScore
+from yatube.settings import (TRENDING_CACHE_TIMEOUT, TRENDING_HALF_LIFE,
+                             TRENDING_SIZE)
+
+DECAY = math.log(2) / TRENDING_HALF_LIFE
+# weights are counted from here, so their logarithms stay small numbers
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+TOP_KEY = 'trending-top'
+# score of a post without comments, exp() of it is 0; finite, so every
+# database stores it
+NO_SCORE = -1e300
+
+
+def log_weight(created):
+    """Logarithm of the weight of a comment created at the time"""
+    return DECAY * (created - EPOCH).total_seconds()
+
+
+def log_add(a, b):
+    """log(exp(a) + exp(b)) without overflow"""
+    if a <= NO_SCORE:
+        return b
+    high, low = max(a, b), min(a, b)
+    return high + math.log1p(math.exp(low - high))
+
+
+def record(comments):
+    """Add the weights of new comments to the scores of their posts"""
+    weights = {}
+    for comment in comments:
+        weights[comment.post_id] = log_add(
+            weights.get(comment.post_id, -math.inf),
+            log_weight(comment.created)
+        )
+    with transaction.atomic():
+        # a concurrent first comment may create the same row, so missing
+        # rows are inserted empty and then locked and added to like the
+        # others
+        TrendingScore.objects.bulk_create(
+            (TrendingScore(post_id=post_id, score=NO_SCORE)
+             for post_id in weights),
+            ignore_conflicts=True,
+        )
+        rows = TrendingScore.objects.select_for_update().in_bulk(
+            list(weights)
+        )
+        for post_id, row in rows.items():
+            row.score = log_add(row.score, weights[post_id])
+        TrendingScore.objects.bulk_update(rows.values(), ['score'])
+    scores = {post_id: row.score for post_id, row in rows.items()}
+    _merge_top(scores)
+
+
+def _merge_top(scores):
+    # other scores only grow, so the new top is among the old top and
+    # the changed posts; a lost concurrent update lasts until the list
+    # is reloaded from the table
+    top = cache.get(TOP_KEY)
+    if top is None:
+        return
+    merged = dict(top)
+    merged.update(scores)
+    top = heapq.nlargest(TRENDING_SIZE, merged.items(), key=itemgetter(1))
+    cache.set(TOP_KEY, top, TRENDING_CACHE_TIMEOUT)
+
+
+def top():
+    """(post_id, score) of the trending posts, best first"""
+    top = cache.get(TOP_KEY)
+    if top is None:
+        # one indexed range, not an aggregation over comments
+        top = list(TrendingScore.objects.order_by('-score').values_list(
+            'post_id', 'score'
+        )[:TRENDING_SIZE])
+        cache.set(TOP_KEY, top, TRENDING_CACHE_TIMEOUT)
+    return top
@@ -0,0 +1,138 @@
+"""
+Size-capped image uploads verified off the request path.
+
+Every upload is streamed to a temporary file and the request body is no
+longer read once a file goes over UPLOAD_MAX_BYTES; the form reports
+such a file as too large. In the request an image is checked by its
+header only: format and dimensions. Decoding the whole image is left to
+a background task, which marks the post image ready or removes an image
+that does not decode. Images whose task was lost, e.g. with a restarted
+worker, are verified by the verify_images command.
+"""
+import logging
+
+from django import forms
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.uploadhandler import (StopUpload,
+                                             TemporaryFileUploadHandler)
+from PIL import Image
+
+from core.tasks import run_in_background
+from posts.cache import bump_feed_version, post_scopes
+from posts.models import Post
+from posts.thumbnails import generate_thumbnails
+from yatube.settings import UPLOAD_MAX_BYTES, UPLOAD_MAX_PIXELS
+
+logger = logging.getLogger(__name__)
+
+
+class SizeLimitedUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploads to disk, stop reading at UPLOAD_MAX_BYTES of a file"""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > UPLOAD_MAX_BYTES:
+            # the rest of the body is not read, the fields after this
+            # file are lost and the form reports it as too large
+            self.request.stopped_uploads = (
+                *stopped_uploads(self.request), self.field_name
+            )
+            raise StopUpload(connection_reset=True)
+        self.file.write(raw_data)
+
+
+def stopped_uploads(request):
+    """Names of file fields of the request not read for their size"""
+    return getattr(request, 'stopped_uploads', ())
+
+
+def too_large():
+    return forms.ValidationError(
+        'Файл больше %(limit)d МБ.', code='file_too_large',
+        params={'limit': UPLOAD_MAX_BYTES // (1024 * 1024)},
+    )
+
+
+def check_image(file):
+    """Validate an uploaded image by its size and header"""
+    if file.size > UPLOAD_MAX_BYTES:
+        raise too_large()
+    try:
+        # reads the header, pixels are decoded on first access
+        image = Image.open(file)
+    except Exception:
+        raise forms.ValidationError(
+            forms.ImageField.default_error_messages['invalid_image'],
+            code='invalid_image',
+        )
+    width, height = image.size
+    if width * height > UPLOAD_MAX_PIXELS:
+        raise forms.ValidationError(
+            'Картинка больше %(limit)d пикселей.', code='too_many_pixels',
+            params={'limit': UPLOAD_MAX_PIXELS},
+        )
+    file.image = image
+    file.content_type = Image.MIME.get(image.format)
+    if hasattr(file, 'seek') and callable(file.seek):
+        file.seek(0)
+
+
+def image_to_python(field, data):
+    """ImageField.to_python checking the header instead of decoding"""
+    file = forms.FileField.to_python(field, data)
+    if file is not None:
+        check_image(file)
+    return file
+
+
+def verify_image(post_id, name):
+    """Decode the post image, mark it ready or remove a broken one"""
+    post = Post.objects.filter(pk=post_id, image=name).first()
+    if post is None:
+        # deleted or replaced by a newer image
+        return
+    try:
+        file = post.image.open('rb')
+    except (OSError, SuspiciousFileOperation):
+        # not a decoding problem, the image stays hidden
+        logger.warning('Cannot read image %s of post %s', name, post_id)
+        return
+    with file:
+        try:
+            Image.open(file).verify()
+            # verify() leaves the image unusable, decode a fresh one
+            file.seek(0)
+            Image.open(file).load()
+            broken = False
+        except Exception:
+            broken = True
+    if broken:
+        logger.warning('Removing broken image %s of post %s', name, post_id)
+        Post.objects.filter(pk=post_id, image=name).update(
+            image='', image_ready=True
+        )
+        post.image.storage.delete(name)
+        bump_feed_version(*post_scopes(post))
+        return
+    if Post.objects.filter(pk=post_id, image=name).update(image_ready=True):
+        # bumps the scopes of the post as well
+        generate_thumbnails(post_id)
+
+
+def schedule_verify(post):
+    """Verify the post image in background"""
+    run_in_background(verify_image, post.pk, post.image.name)
+
+
+def verify_pending():
+    """Verify images left unverified, return their number"""
+    pending = list(Post.objects.filter(image_ready=False).exclude(
+        image=''
+    ).order_by('pk').values_list('pk', 'image'))
+    for post_id, name in pending:
+        verify_image(post_id, name)
+    return len(pending)
@@ -2,55 +2,102 @@
 View functions for Posts app
 """
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
 from django.shortcuts import redirect, render, get_object_or_404
+from django.views.decorators.http import condition
 
+from posts import search as fts, trending, uploads
+from posts.search import normalize
+from posts.cache import feed_cache_context, feed_etag, tag_page
 from posts.forms import PostForm, CommentForm
-from posts.models import Group, Post, User, Follow
-from yatube.settings import POSTS_PER_PAGE
+from posts.models import (Comment, FeedEntry, Group, Mention, Post, PostTag,
+                          Tag, User, Follow)
+from posts.paginator import CursorPaginator
+from posts.stats import get_stats
+from yatube.settings import POSTS_PER_PAGE, SEARCH_RESULTS
 
 
+def _index_etag(request):
+    return feed_etag('index', request=request)
+
+
+def _group_etag(request, slug):
+    group_id = Group.objects.filter(slug=slug).values_list(
+        'pk', flat=True
+    ).first()
+    if group_id is not None:
+        return feed_etag(f'group:{group_id}', request=request)
+
+
+def _profile_etag(request, username):
+    author_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    ).first()
+    if author_id is not None:
+        # the follow button depends on follows of the visitor
+        return feed_etag(f'author:{author_id}',
+                         f'follows:{request.user.pk}',
+                         request=request)
+
+
+def _post_etag(request, post_id):
+    author_id = Post.objects.filter(pk=post_id).values_list(
+        'author_id', flat=True
+    ).first()
+    if author_id is not None:
+        return feed_etag(f'post:{post_id}', f'comments:{post_id}',
+                         f'author:{author_id}', request=request)
+
+
+@condition(etag_func=_index_etag)
 def index(request):
     """Main page"""
     template = 'posts/index.html'
 
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = Post.objects.for_list()
+    paginator = CursorPaginator(post_list, POSTS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    tag_page(request, 'index',
+             *(f'post:{post.pk}' for post in page_obj))
 
     context = {
         'description': 'Это главная страница проекта Yatube',
         'page_obj': page_obj,
+        **feed_cache_context('index'),
     }
     return render(request, template, context)
 
 
+@condition(etag_func=_group_etag)
 def group_posts(request, slug):
     """Groups posts page"""
     template = 'posts/group_list.html'
 
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    post_list = group.posts.for_list()
+    paginator = CursorPaginator(post_list, POSTS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    tag_page(request, f'group:{group.pk}',
+             *(f'post:{post.pk}' for post in page_obj))
 
     context = {
         'description': 'Информация о группах проекта Yatube',
         'group': group,
         'page_obj': page_obj,
+        **feed_cache_context(f'group:{group.pk}'),
     }
     return render(request, template, context)
 
 
+@condition(etag_func=_profile_etag)
 def profile(request, username):
     """Profile page"""
-    author = User.objects.get(username=username)
-    post_list = Post.objects.filter(author=author)
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    author = User.objects.select_related('stats').get(username=username)
+    post_list = Post.objects.filter(author=author).for_list()
+    paginator = CursorPaginator(post_list, POSTS_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    tag_page(request, f'author:{author.pk}',
+             *(f'post:{post.pk}' for post in page_obj))
 
     if request.user.is_authenticated:
         following = Follow.objects.filter(user=request.user,
@@ -62,30 +109,37 @@ def profile(request, username):
         'description': 'Информация о пользователе',
         'author': author,
         'page_obj': page_obj,
-        'total_count': post_list.count(),
-        'following': following
+        'total_count': get_stats(author).posts_count,
+        'following': following,
+        **feed_cache_context(f'author:{author.pk}'),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@condition(etag_func=_post_etag)
 def post_detail(request, post_id):
     """Post page"""
-    post = Post.objects.get(pk=post_id)
+    post = Post.objects.select_related(
+        'author__stats', 'group'
+    ).get(pk=post_id)
     preview = post.text[:30]
 
+    tag_page(request, f'post:{post.pk}', f'comments:{post.pk}',
+             f'author:{post.author_id}')
     form = CommentForm()
     context = {
         'description': 'Информация о посте',
         'preview': preview,
         'post': post,
-        'total_count': post.author.posts.count(),
+        'total_count': get_stats(post.author).posts_count,
         'form': form,
-        'comments': post.comments.all(),
+        'comments': post.comments.for_list(),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
+@transaction.atomic
 def post_create(request):
     """Create post page"""
     author = User.objects.get(username=request.user)
@@ -93,7 +147,8 @@ def post_create(request):
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
-        instance=post
+        instance=post,
+        stopped_uploads=uploads.stopped_uploads(request)
     )
 
     if request.POST and form.is_valid():
@@ -116,7 +171,8 @@ def post_edit(request, post_id):
     form = PostForm(
         request.POST or None,
         files=request.FILES or None,
-        instance=post
+        instance=post,
+        stopped_uploads=uploads.stopped_uploads(request)
     )
 
     if request.POST and form.is_valid():
@@ -132,6 +188,7 @@ def post_edit(request, post_id):
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -146,20 +203,68 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     template = 'posts/follow.html'
-    authors = Follow.objects.filter(user=request.user).values('author')
-    post_list = Post.objects.filter(author__in=authors)
-    paginator = Paginator(post_list, POSTS_PER_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # feed is materialized on write, see posts.feed
+    entries = FeedEntry.objects.filter(user=request.user).for_list()
+    paginator = CursorPaginator(entries, POSTS_PER_PAGE,
+                                fields=('pub_date', 'post_id'))
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    page_obj.object_list = [entry.post for entry in page_obj]
 
     context = {
         'description': 'Это cтраница с подписками',
         'page_obj': page_obj,
+        # bumped on follow, unfollow and backfill of the user
+        **feed_cache_context(f'follows:{request.user.pk}'),
     }
     return render(request, template, context)
 
 
+def trending_posts(request):
+    """Posts with the most comments lately"""
+    # the list is kept up to date on comment, see posts.trending
+    post_ids = [post_id for post_id, _ in trending.top()]
+    posts = Post.objects.for_list().in_bulk(post_ids)
+    context = {
+        'description': 'Это cтраница с популярными записями',
+        'posts': [posts[pk] for pk in post_ids if pk in posts],
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+def tag_posts(request, tag):
+    """Posts and comments with a hashtag"""
+    tag = get_object_or_404(Tag, name=normalize(tag))
+    # tags are parsed on write, see posts.tags
+    entries = PostTag.objects.filter(tag=tag).for_list()
+    page_obj = CursorPaginator(entries, POSTS_PER_PAGE).get_page(
+        request.GET.get('cursor')
+    )
+    context = {
+        'description': f'Записи с тегом #{tag.name}',
+        'tag': tag,
+        'page_obj': page_obj,
+        'posts': [entry.post for entry in page_obj],
+    }
+    return render(request, 'posts/tag.html', context)
+
+
 @login_required
+def mentions(request):
+    """Posts and comments mentioning the user"""
+    entries = Mention.objects.filter(user=request.user).for_list()
+    page_obj = CursorPaginator(entries, POSTS_PER_PAGE).get_page(
+        request.GET.get('cursor')
+    )
+    context = {
+        'description': 'Это cтраница с упоминаниями',
+        'page_obj': page_obj,
+        'posts': [entry.post for entry in page_obj],
+    }
+    return render(request, 'posts/mentions.html', context)
+
+
+@login_required
+@transaction.atomic
 def profile_follow(request, username):
     author = User.objects.get(username=username)
     already_follower = Follow.objects.filter(user=request.user,
@@ -170,7 +275,25 @@ def profile_follow(request, username):
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
     author = User.objects.get(username=username)
     Follow.objects.filter(user=request.user, author=author).delete()
     return redirect('posts:profile', username=username)
+
+
+def search(request):
+    """Search page, the most relevant posts and comments first"""
+    query = request.GET.get('q', '').strip()
+    context = {
+        'description': 'Поиск по записям и комментариям',
+        'query': query,
+    }
+    if query:
+        context['posts'] = fts.ranked(
+            Post.objects.for_list(), query
+        )[:SEARCH_RESULTS]
+        context['comments'] = fts.ranked(
+            Comment.objects.for_list(), query
+        )[:SEARCH_RESULTS]
+    return render(request, 'posts/search.html', context)
@@ -5,9 +5,49 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# memcached address shared by all processes, see CACHES
+CACHE_LOCATION = os.getenv('CACHE_LOCATION')
+# writes purge cached pages by bumping versions in the cache; processes
+# with private caches do not see each other's bumps, so entries may be
+# kept for hours only with a shared cache
+SHARED_CACHE = bool(CACHE_LOCATION)
+CACHE_TIMEOUT = 60 * 60 * 6 if SHARED_CACHE else 20
+
 # CONSTANTS
 EMPTY_VALUE = '-пусто-'
 POSTS_PER_PAGE = 10
+# newest posts of an author copied into the feed on follow
+FEED_BACKFILL_POSTS = POSTS_PER_PAGE * 5
+SEARCH_RESULTS = 20
+AUTOCOMPLETE_RESULTS = 10
+# seconds after which a process reloads its autocomplete indexes, when
+# the cache is private and it misses the version bumps of other ones
+AUTOCOMPLETE_RELOAD = None if SHARED_CACHE else 60
+# uploads larger than this are not stored, images above this number of
+# pixels are rejected by their header
+UPLOAD_MAX_BYTES = 5 * 1024 * 1024
+UPLOAD_MAX_PIXELS = 4096 * 4096
+# trending posts: list length, comment weight half-life and seconds the
+# list is kept in cache between refreshes from the scores table
+TRENDING_SIZE = 20
+TRENDING_HALF_LIFE = 60 * 60 * 6
+TRENDING_CACHE_TIMEOUT = 60 * 5 if SHARED_CACHE else CACHE_TIMEOUT
+# admin lists count rows exactly up to this number, see posts.paginator
+EXACT_COUNT_LIMIT = 10000
+FEED_CACHE_TIMEOUT = CACHE_TIMEOUT
+PAGE_CACHE_TIMEOUT = CACHE_TIMEOUT
+# thumbnail alias: (geometry, options), rendered when a post is saved
+POST_THUMBNAILS = {
+    'card': ('960x339', {'crop': 'center', 'upscale': True}),
+}
+API_MAX_PAGE_SIZE = 100
+API_STREAM_CHUNK_SIZE = 500
+API_BULK_CREATE_LIMIT = 1000
+API_CACHE_TIMEOUT = CACHE_TIMEOUT
+API_CHANGES_BATCH_SIZE = 500
+# seconds a user resolved from JWT is kept in cache; a private cache
+# would keep a changed or deactivated user in other processes
+JWT_USER_CACHE_TIMEOUT = 60 * 5 if SHARED_CACHE else 0
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -51,6 +91,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'posts.middleware.AnonymousPageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -135,12 +176,41 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# uploads are streamed to disk and capped, see posts.uploads
+FILE_UPLOAD_HANDLERS = ['posts.uploads.SizeLimitedUploadHandler']
+
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+    } if not SHARED_CACHE else {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': CACHE_LOCATION,
+    },
+    # thumbnail URLs and sorl-thumbnail key-value store, large enough
+    # to keep every image, so lookups do not fall back to the database;
+    # shared, so a restarted process does not render pages without images
+    'thumbnails': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'thumbnails',
+        'TIMEOUT': None,
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    } if not SHARED_CACHE else {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': CACHE_LOCATION,
+        'KEY_PREFIX': 'thumbnails',
+        'TIMEOUT': None,
+    },
 }
 
+# cache of the default, database backed, sorl-thumbnail key-value store
+THUMBNAIL_CACHE = 'thumbnails'
+
+# worker threads of core.tasks, run tasks inline when eager
+BACKGROUND_WORKERS = 2
+BACKGROUND_TASKS_EAGER = False
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 REST_FRAMEWORK = {
@@ -149,7 +219,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'PAGE_SIZE': 5,
 }